@@ -1,7 +1,10 @@
 """
-Funcao que auxilia na formatacao do dados
+Funcoes que auxiliam na formatacao do dados
 """
 
+# 31 bytes always fit below the 255 bit scalar field modulus
+CHUNK_SIZE = 31
+
 
 def format_data(data, data_len):
     if type(data) != bytes:
@@ -11,3 +14,17 @@ def format_data(data, data_len):
         padding = b"\x00" * (data_len - len(data))
         data = data + padding
     return data
+
+
+def field_elements(data, chunk_size=CHUNK_SIZE):
+    """
+    Streams data as big endian integers of chunk_size bytes, without
+    copying it. The last chunk is read as if zero padded on the right,
+    the same values format_data followed by slicing would give.
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    view = memoryview(data).cast("B")
+    for start in range(0, len(view), chunk_size):
+        chunk = view[start : start + chunk_size]
+        yield int.from_bytes(chunk, "big") << (8 * (chunk_size - len(chunk)))
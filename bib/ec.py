@@ -6,14 +6,22 @@ from __future__ import annotations
 
 from collections import namedtuple
 from copy import deepcopy
+from functools import lru_cache
 
 import bib.bls12381 as bls12381
-from bib.fields import FieldExtBase, Fq, Fq6, Fq12
+from bib.fields import FieldExtBase, Fq, Fq2, Fq6, Fq12, batch_invert
 
 # Struct for elliptic curve parameters
 EC = namedtuple("EC", "q a b gx gy g2x g2y n h x k sqrt_n3 sqrt_n3m1o2")
 
 default_ec = EC(*bls12381.parameters())
+default_ec_twist = EC(*bls12381.parameters_twist())
+
+# Flags in the first byte of the compressed encoding, see
+# https://github.com/zkcrypto/pairing/tree/master/src/bls12_381#serialization
+COMPRESSION_FLAG = 0x80
+INFINITY_FLAG = 0x40
+SIGN_FLAG = 0x20
 
 
 class AffinePoint:
@@ -98,7 +106,7 @@ class AffinePoint:
     def __mul__(self, c) -> AffinePoint:
         if not isinstance(c, Fq) and not isinstance(c, int):
             raise ValueError("Error, must be int or Fq")
-        return scalar_mult_jacobian(c, self.to_jacobian(), self.ec).to_affine()
+        return scalar_mult_wnaf(c, self.to_jacobian(), self.ec, self.FE).to_affine()
 
     def negate(self) -> AffinePoint:
         return AffinePoint(self.x, -self.y, self.infinity, self.ec)
@@ -108,7 +116,7 @@ class AffinePoint:
 
     def to_jacobian(self) -> JacobianPoint:
         return JacobianPoint(
-            self.x, self.y, self.FE.one(self.ec.q), self.infinity, self.ec
+            self.x, self.y, self.FE.one(self.ec.q), self.infinity, self.ec, True
         )
 
     def __deepcopy__(self, memo) -> AffinePoint:
@@ -116,15 +124,33 @@ class AffinePoint:
             deepcopy(self.x, memo), deepcopy(self.y, memo), self.infinity, self.ec
         )
 
+    def __bytes__(self) -> bytes:
+        """
+        Compressed encoding, 48 bytes for G1 and 96 bytes for G2.
+        """
+        return encode_point(self.x, self.y, self.infinity, self.ec)
+
+    @staticmethod
+    def from_bytes(buffer: bytes) -> AffinePoint:
+        return decode_point(buffer)
+
+    @staticmethod
+    def from_bytes_unchecked(buffer: bytes) -> AffinePoint:
+        """
+        Skips the subgroup check, only for trusted inputs.
+        """
+        return decode_point(buffer, False)
+
 
 class JacobianPoint:
     """
     Elliptic curve point, can represent any curve, and use Fq or Fq2
     coordinates. Uses Jacobian coordinates so that point addition
-    does not require slow inversion.
+    does not require slow inversion. z_one marks points known to have
+    z = 1, which can use the cheaper mixed addition.
     """
 
-    def __init__(self, x, y, z, infinity: bool, ec=default_ec):
+    def __init__(self, x, y, z, infinity: bool, ec=default_ec, z_one: bool = False):
 
         if (
             not isinstance(x, Fq)
@@ -139,6 +165,7 @@ class JacobianPoint:
         self.z = z
         self.infinity = infinity
         self.ec = ec
+        self.z_one = z_one
 
     def is_on_curve(self) -> bool:
         if self.infinity:
@@ -146,7 +173,7 @@ class JacobianPoint:
         return self.to_affine().is_on_curve()
 
     def negate(self) -> JacobianPoint:
-        return self.to_affine().negate().to_jacobian()
+        return JacobianPoint(self.x, -self.y, self.z, self.infinity, self.ec, self.z_one)
 
     def to_affine(self) -> AffinePoint:
         if self.infinity:
@@ -174,7 +201,14 @@ class JacobianPoint:
     def __eq__(self, other) -> bool:
         if not isinstance(other, JacobianPoint):
             return False
-        return self.to_affine() == other.to_affine()
+        if self.infinity or other.infinity:
+            return self.infinity == other.infinity
+        # X1/Z1^2 == X2/Z2^2 and Y1/Z1^3 == Y2/Z2^3, without inversions
+        z1_sq = self.z * self.z
+        z2_sq = other.z * other.z
+        if not self.x * z2_sq == other.x * z1_sq:
+            return False
+        return self.y * z2_sq * other.z == other.y * z1_sq * self.z
 
     def __ne__(self, other) -> bool:
         return not self.__eq__(other)
@@ -182,13 +216,16 @@ class JacobianPoint:
     def __mul__(self, c) -> JacobianPoint:
         if not isinstance(c, int) and not isinstance(c, Fq):
             raise ValueError("Error, must be int or Fq")
-        return scalar_mult_jacobian(c, self, self.ec)
+        return scalar_mult_wnaf(c, self, self.ec, self.FE)
 
     def __rmul__(self, c) -> JacobianPoint:
         return self.__mul__(c)
 
     def __neg__(self) -> JacobianPoint:
-        return self.to_affine().negate().to_jacobian()
+        return self.negate()
+
+    def __sub__(self, other: JacobianPoint) -> JacobianPoint:
+        return self.__add__(other.negate())
 
     def __str__(self) -> str:
         return (
@@ -213,12 +250,134 @@ class JacobianPoint:
             deepcopy(self.z, memo),
             self.infinity,
             self.ec,
+            self.z_one,
         )
 
+    def __bytes__(self) -> bytes:
+        return bytes(self.to_affine())
+
+    @staticmethod
+    def from_bytes(buffer: bytes) -> JacobianPoint:
+        return decode_point(buffer).to_jacobian()
+
+    @staticmethod
+    def from_bytes_unchecked(buffer: bytes) -> JacobianPoint:
+        """
+        Skips the subgroup check, only for trusted inputs.
+        """
+        return decode_point(buffer, False).to_jacobian()
+
     def __hash__(self) -> int:
         return int.from_bytes(bytes(self), "big")
 
 
+def encode_point(x, y, infinity: bool, ec=default_ec) -> bytes:
+    """
+    ZCash compressed encoding: the x coordinate in big endian, with the
+    compression, infinity and sign of y flags in the top 3 bits.
+    """
+    # the curve coefficient tells G1 (Fq) and G2 (Fq2) apart, even at infinity
+    size = 48 * type(ec.b).extension
+    if infinity:
+        return bytes([COMPRESSION_FLAG | INFINITY_FLAG]) + bytes(size - 1)
+    buffer = bytearray(bytes(x))
+    buffer[0] |= COMPRESSION_FLAG
+    if __lexicographically_largest(y):
+        buffer[0] |= SIGN_FLAG
+    return bytes(buffer)
+
+
+def decode_point(buffer: bytes, check_subgroup: bool = True) -> AffinePoint:
+    """
+    Decodes a compressed G1 (48 bytes) or G2 (96 bytes) point, recovering
+    y from the curve equation. Points are checked to be on the curve and,
+    unless check_subgroup is False, to be in the order n subgroup.
+    """
+    if len(buffer) == 48:
+        FE, ec = Fq, default_ec
+    elif len(buffer) == 96:
+        FE, ec = Fq2, default_ec_twist
+    else:
+        raise ValueError("invalid point encoding length")
+
+    flags = buffer[0]
+    if not flags & COMPRESSION_FLAG:
+        raise ValueError("only compressed points are supported")
+    data = bytes([flags & 0x1F]) + bytes(buffer[1:])
+    if flags & INFINITY_FLAG:
+        if flags & SIGN_FLAG or any(data):
+            raise ValueError("invalid point at infinity encoding")
+        return AffinePoint(FE.zero(ec.q), FE.zero(ec.q), True, ec)
+
+    coordinates = [int.from_bytes(data[i : i + 48], "big") for i in range(0, len(data), 48)]
+    if any(c >= ec.q for c in coordinates):
+        raise ValueError("invalid field element")
+    x = FE.from_bytes(data, ec.q)
+    y = (x * x * x + ec.b).modsqrt()
+    if isinstance(y, Fq) and FE is Fq2:
+        y = Fq2(ec.q, y, Fq.zero(ec.q))
+    if __lexicographically_largest(y) != bool(flags & SIGN_FLAG):
+        y = -y
+    point = AffinePoint(x, y, False, ec)
+    if not point.is_on_curve():
+        raise ValueError("point is not on the curve")
+    if check_subgroup and not in_subgroup(point.to_jacobian()):
+        raise ValueError("point is not in the order n subgroup")
+    return point
+
+
+def in_subgroup(p1: JacobianPoint) -> bool:
+    """
+    Checks that n * P is the point at infinity.
+    """
+    if p1.infinity:
+        return True
+    return scalar_mult_wnaf(p1.ec.n, p1, p1.ec, p1.FE).infinity
+
+
+def batch_to_affine(points) -> list:
+    """
+    Converts many Jacobian points to affine coordinates with a single
+    field inversion per coordinate field, so G1 and G2 points can be mixed.
+    """
+    groups = {}
+    for i, p in enumerate(points):
+        if not p.infinity:
+            groups.setdefault(type(p.z), []).append(i)
+    affine = [p.to_affine() if p.infinity else None for p in points]
+    for indices in groups.values():
+        inverses = batch_invert([points[i].z for i in indices])
+        for i, z_inv in zip(indices, inverses):
+            p = points[i]
+            z_inv_sq = z_inv * z_inv
+            affine[i] = AffinePoint(p.x * z_inv_sq, p.y * z_inv_sq * z_inv, False, p.ec)
+    return affine
+
+
+def points_to_bytes(points) -> list:
+    """
+    Encodes many points, sharing a single inversion to bring all the
+    Jacobian ones to affine coordinates.
+    """
+    jacobian = [i for i, p in enumerate(points) if isinstance(p, JacobianPoint)]
+    affine = list(points)
+    for i, p in zip(jacobian, batch_to_affine([points[i] for i in jacobian])):
+        affine[i] = p
+    return [bytes(p) for p in affine]
+
+
+def points_from_bytes(buffers) -> list:
+    return [decode_point(b) for b in buffers]
+
+
+def __lexicographically_largest(y) -> bool:
+    # y > -y, comparing the most significant coordinate first
+    for c in reversed(tuple(y)):
+        if c.value:
+            return c.value > (c.Q - 1) // 2
+    return False
+
+
 def double_point(p1: AffinePoint, ec=default_ec, FE=Fq) -> AffinePoint:
     """
     Basic elliptic curve point doubling
@@ -261,8 +420,10 @@ def double_point_jacobian(p1: JacobianPoint, ec=default_ec, FE=Fq) -> JacobianPo
     http://www.hyperelliptic.org/EFD/oldefd/jacobian.html
     """
     X, Y, Z = p1.x, p1.y, p1.z
-    if Y == FE.zero(ec.q) or p1.infinity:
+    if p1.infinity or not Y:
         return JacobianPoint(FE.one(ec.q), FE.one(ec.q), FE.zero(ec.q), True, ec)
+    if not ec.a:
+        return double_point_jacobian_a0(p1, ec)
 
     # S = 4*X*Y^2
     S = Fq(ec.q, 4) * X * Y * Y
@@ -285,25 +446,55 @@ def double_point_jacobian(p1: JacobianPoint, ec=default_ec, FE=Fq) -> JacobianPo
     return JacobianPoint(X_p, Y_p, Z_p, False, ec)
 
 
+def double_point_jacobian_a0(p1: JacobianPoint, ec=default_ec) -> JacobianPoint:
+    """
+    Doubling for curves with a = 0, using only additions for the small
+    constants, see
+    https://hyperelliptic.org/EFD/g1p/auto-shortw-jacobian-0.html#doubling-dbl-2009-l
+    """
+    X, Y, Z = p1.x, p1.y, p1.z
+    A = X.square()
+    B = Y.square()
+    C = B.square()
+    D = (X + B).square() - A - C
+    D = D + D
+    E = A + A + A
+    F = E.square()
+    X3 = F - D - D
+    C8 = C + C
+    C8 = C8 + C8
+    C8 = C8 + C8
+    Y3 = E * (D - X3) - C8
+    Z3 = Y if p1.z_one else Y * Z
+    return JacobianPoint(X3, Y3, Z3 + Z3, False, ec)
+
+
 def add_points_jacobian(
     p1: JacobianPoint, p2: JacobianPoint, ec=default_ec, FE=Fq
 ) -> JacobianPoint:
     """
     Jacobian elliptic curve point addition, see
     http://www.hyperelliptic.org/EFD/oldefd/jacobian.html
+    Uses the mixed addition when one of the points has z = 1.
     """
     if p1.infinity:
         return p2
     if p2.infinity:
         return p1
+    if p1.z_one and not p2.z_one:
+        p1, p2 = p2, p1
+    if p2.z_one:
+        return add_points_mixed(p1, p2, ec, FE)
     # U1 = X1*Z2^2
-    U1 = p1.x * (p2.z**2)
+    Z2_sq = p2.z.square()
+    U1 = p1.x * Z2_sq
     # U2 = X2*Z1^2
-    U2 = p2.x * (p1.z**2)
+    Z1_sq = p1.z.square()
+    U2 = p2.x * Z1_sq
     # S1 = Y1*Z2^3
-    S1 = p1.y * (p2.z**3)
+    S1 = p1.y * Z2_sq * p2.z
     # S2 = Y2*Z1^3
-    S2 = p2.y * (p1.z**3)
+    S2 = p2.y * Z1_sq * p1.z
     if U1 == U2:
         if S1 != S2:
             return JacobianPoint(FE.one(ec.q), FE.one(ec.q), FE.zero(ec.q), True, ec)
@@ -314,17 +505,58 @@ def add_points_jacobian(
     H = U2 - U1
     # R = S2 - S1
     R = S2 - S1
-    H_sq = H * H
+    H_sq = H.square()
     H_cu = H * H_sq
+    U1_H_sq = U1 * H_sq
     # X3 = R^2 - H^3 - 2*U1*H^2
-    X3 = R * R - H_cu - Fq(ec.q, 2) * U1 * H_sq
+    X3 = R.square() - H_cu - U1_H_sq - U1_H_sq
     # Y3 = R*(U1*H^2 - X3) - S1*H^3
-    Y3 = R * (U1 * H_sq - X3) - S1 * H_cu
+    Y3 = R * (U1_H_sq - X3) - S1 * H_cu
     # Z3 = H*Z1*Z2
     Z3 = H * p1.z * p2.z
     return JacobianPoint(X3, Y3, Z3, False, ec)
 
 
+def add_points_mixed(
+    p1: JacobianPoint, p2: JacobianPoint, ec=default_ec, FE=Fq
+) -> JacobianPoint:
+    """
+    Jacobian plus affine (z2 = 1) addition, same formulas as
+    add_points_jacobian with Z2 = 1 so U1 = X1 and S1 = Y1.
+    """
+    # U2 = X2*Z1^2, S2 = Y2*Z1^3
+    if p1.z_one:
+        U2, S2 = p2.x, p2.y
+    else:
+        Z1_sq = p1.z.square()
+        U2 = p2.x * Z1_sq
+        S2 = p2.y * Z1_sq * p1.z
+    U1, S1 = p1.x, p1.y
+    if U1 == U2:
+        if S1 != S2:
+            return JacobianPoint(FE.one(ec.q), FE.one(ec.q), FE.zero(ec.q), True, ec)
+        else:
+            return double_point_jacobian(p1, ec, FE)
+
+    H = U2 - U1
+    R = S2 - S1
+    H_sq = H.square()
+    H_cu = H * H_sq
+    U1_H_sq = U1 * H_sq
+    X3 = R.square() - H_cu - U1_H_sq - U1_H_sq
+    Y3 = R * (U1_H_sq - X3) - S1 * H_cu
+    Z3 = H if p1.z_one else H * p1.z
+    return JacobianPoint(X3, Y3, Z3, False, ec)
+
+
+def normalize(points) -> list:
+    """
+    Brings Jacobian points to z = 1, with a single shared inversion, so
+    that adding them uses the mixed addition.
+    """
+    return [p.to_jacobian() for p in batch_to_affine(points)]
+
+
 def scalar_mult(c, p1: AffinePoint, ec=default_ec, FE=Fq) -> AffinePoint:
     """
     Double and add, see
@@ -366,6 +598,414 @@ def scalar_mult_jacobian(c, p1: JacobianPoint, ec=default_ec, FE=Fq) -> Jacobian
     return result
 
 
+def wnaf(c: int, window: int) -> list:
+    """
+    Width-w non-adjacent form of c >= 0, least significant digit first.
+    Every nonzero digit is odd, below 2^(w-1) in absolute value, and is
+    followed by at least w - 1 zeros.
+    """
+    digits = []
+    while c > 0:
+        if c & 1:
+            d = c & ((1 << window) - 1)
+            if d >= 1 << (window - 1):
+                d -= 1 << window
+            c -= d
+        else:
+            d = 0
+        digits.append(d)
+        c >>= 1
+    return digits
+
+
+def wnaf_window(bits: int) -> int:
+    # small scalars do not pay back a table of odd multiples
+    if bits <= 16:
+        return 2
+    if bits <= 128:
+        return 4
+    return 5
+
+
+def scalar_mult_wnaf(c, p1: JacobianPoint, ec=default_ec, FE=Fq) -> JacobianPoint:
+    """
+    Width-w NAF scalar multiplication, see Guide to Elliptic Curve
+    Cryptography, algorithm 3.36. Negative digits use the cheap Jacobian
+    negation of the odd multiples table.
+    """
+    if isinstance(c, Fq):
+        c = c.value
+    if c < 0:
+        c, p1 = -c, p1.negate()
+    if p1.infinity or c == 0:
+        return JacobianPoint(FE.one(ec.q), FE.one(ec.q), FE.zero(ec.q), True, ec)
+
+    window = wnaf_window(c.bit_length())
+    table = odd_multiples(p1, window, ec, FE)
+    return interleaved_wnaf([(wnaf(c, window), table)], ec, FE)
+
+
+def odd_multiples(p1: JacobianPoint, window: int, ec=default_ec, FE=Fq) -> list:
+    """
+    The wNAF table P, 3P, 5P, ..., (2^(w-1) - 1)P.
+    """
+    table = [p1]
+    if window > 2:
+        double = double_point_jacobian(p1, ec, FE)
+        for _ in range(1, 1 << (window - 2)):
+            table.append(add_points_jacobian(table[-1], double, ec, FE))
+        table = normalize(table)
+    return table
+
+
+def interleaved_wnaf(terms, ec=default_ec, FE=Fq) -> JacobianPoint:
+    """
+    Computes sum(c_i * P_i) from (wNAF digits of c_i, odd multiples of P_i)
+    pairs, sharing one chain of doublings between all the terms.
+    """
+    terms = [(digits, table, [p.negate() for p in table]) for digits, table in terms]
+    length = max(len(digits) for digits, _, _ in terms)
+
+    result = JacobianPoint(FE.one(ec.q), FE.one(ec.q), FE.zero(ec.q), True, ec)
+    for i in reversed(range(length)):
+        result = double_point_jacobian(result, ec, FE)
+        for digits, table, negated in terms:
+            d = digits[i] if i < len(digits) else 0
+            if d > 0:
+                result = add_points_jacobian(result, table[d >> 1], ec, FE)
+            elif d < 0:
+                result = add_points_jacobian(result, negated[-d >> 1], ec, FE)
+    return result
+
+
+def glv_decompose(c: int, ec=default_ec):
+    """
+    Splits c into c1 + c2 * lambda with c1, c2 of about 128 bits, where
+    lambda = x^2 - 1 is the eigenvalue of the G1 endomorphism. As
+    n = lambda^2 + lambda + 1, plain division by lambda is enough.
+    """
+    lamb = ec.x * ec.x - 1
+    c2, c1 = divmod(c % ec.n, lamb)
+    return c1, c2
+
+
+def endomorphism_g1(p1: JacobianPoint, ec=default_ec) -> JacobianPoint:
+    """
+    (x, y) -> (beta x, y), with beta = (-sqrt(-3) - 1) / 2 the cube root of
+    unity for which this map acts as multiplication by x^2 - 1 on G1.
+    """
+    beta = Fq(ec.q, -1 - ec.sqrt_n3m1o2)
+    return JacobianPoint(p1.x * beta, p1.y, p1.z, p1.infinity, ec, p1.z_one)
+
+
+def scalar_mult_glv(c, p1: JacobianPoint, ec=default_ec, FE=Fq) -> JacobianPoint:
+    """
+    GLV scalar multiplication, see https://www.iacr.org/archive/crypto2001/21390189.pdf
+    c * P = c1 * P + c2 * phi(P), computed together with half the doublings.
+    Only valid for G1 points in the order n subgroup.
+    """
+    if isinstance(c, Fq):
+        c = c.value
+    c1, c2 = glv_decompose(c, ec)
+    if p1.infinity or (c1 == 0 and c2 == 0):
+        return JacobianPoint(FE.one(ec.q), FE.one(ec.q), FE.zero(ec.q), True, ec)
+
+    window = wnaf_window(128)
+    table = odd_multiples(p1, window, ec, FE)
+    phi_table = [endomorphism_g1(p, ec) for p in table]
+    return interleaved_wnaf(
+        [(wnaf(c1, window), table), (wnaf(c2, window), phi_table)], ec, FE
+    )
+
+
+@lru_cache(maxsize=None)
+def psi_coefficients(q: int):
+    """
+    Constants of psi, 1 / xi^((q - 1) / 3) and 1 / xi^((q - 1) / 2) with
+    xi = u + 1 the twist non-residue.
+    """
+    xi = Fq2(q, 1, 1)
+    return ~(xi ** ((q - 1) // 3)), ~(xi ** ((q - 1) // 2))
+
+
+def psi(p1: JacobianPoint, ec=default_ec_twist) -> JacobianPoint:
+    """
+    Untwist-Frobenius-twist endomorphism of the twist curve. On G2 it acts
+    as multiplication by q, which is x mod n.
+    """
+    cx, cy = psi_coefficients(ec.q)
+    return JacobianPoint(
+        p1.x.qi_power(1) * cx,
+        p1.y.qi_power(1) * cy,
+        p1.z.qi_power(1),
+        p1.infinity,
+        ec,
+        p1.z_one,
+    )
+
+
+def gls_decompose(c: int, ec=default_ec_twist):
+    """
+    Splits c into c0 + c1 x + c2 x^2 + c3 x^3 with |c_i| < |x|, 64 bits
+    for BLS12-381. n = x^4 - x^2 + 1 < x^4, so these are the base |x|
+    digits of c mod n with the signs of the odd powers of x flipped.
+    """
+    c %= ec.n
+    base = abs(ec.x)
+    sign = -1 if ec.x < 0 else 1
+    digits = []
+    for i in range(4):
+        c, d = divmod(c, base)
+        digits.append(d * sign**i)
+    return digits
+
+
+def scalar_mult_gls(c, p1: JacobianPoint, ec=default_ec_twist, FE=Fq2) -> JacobianPoint:
+    """
+    GLS scalar multiplication on G2, see https://eprint.iacr.org/2008/194.pdf
+    c * P = sum(c_i * psi^i(P)), four 64 bit scalars sharing a quarter of
+    the doublings. Only valid for G2 points in the order n subgroup.
+    """
+    if isinstance(c, Fq):
+        c = c.value
+    digits = gls_decompose(c, ec)
+    if p1.infinity or not any(digits):
+        return JacobianPoint(FE.one(ec.q), FE.one(ec.q), FE.zero(ec.q), True, ec)
+
+    window = wnaf_window(64)
+    table = odd_multiples(p1, window, ec, FE)
+    terms = []
+    for d in digits:
+        if d:
+            signed = table if d > 0 else [p.negate() for p in table]
+            terms.append((wnaf(abs(d), window), signed))
+        table = [psi(p, ec) for p in table]
+    return interleaved_wnaf(terms, ec, FE)
+
+
+# Below this many terms Straus' method beats the bucket method.
+PIPPENGER_THRESHOLD = 256
+
+
+def multi_scalar_mult(scalars, points, ec=None, FE=None) -> JacobianPoint:
+    """
+    Multi-scalar multiplication, computes sum(c_i * P_i) for the given
+    scalars and points sharing the doublings between all terms. Uses
+    Straus' interleaved window method for small inputs and Pippenger's
+    bucket method for large ones.
+    """
+    if len(scalars) != len(points):
+        raise ValueError("scalars and points must have the same length")
+    if len(points) == 0:
+        raise ValueError("at least one point is required")
+    if ec is None:
+        ec = points[0].ec
+    if FE is None:
+        FE = points[0].FE
+
+    terms = []
+    for c, p in zip(scalars, points):
+        if isinstance(c, Fq):
+            c = c.value
+        if c < 0:
+            c, p = -c, -p
+        if c == 0 or p.infinity:
+            continue
+        terms.append((c, p))
+
+    if not terms:
+        return JacobianPoint(FE.one(ec.q), FE.one(ec.q), FE.zero(ec.q), True, ec)
+    if len(terms) < PIPPENGER_THRESHOLD:
+        return __straus(terms, ec, FE)
+    return __pippenger(terms, ec, FE)
+
+
+def __straus(terms, ec, FE, window=4) -> JacobianPoint:
+    """
+    Straus' interleaved window method, see
+    https://cr.yp.to/papers/pippenger.pdf section 4
+    """
+    mask = (1 << window) - 1
+    tables = []
+    for _, p in terms:
+        # table[d] = d * P
+        table = [None, p]
+        for _ in range(2, mask + 1):
+            table.append(table[-1] + p)
+        tables.append(table)
+    # Bring every entry to z = 1 at once, the main loop then uses mixed additions
+    flat = normalize([p for table in tables for p in table[1:]])
+    tables = [[None] + flat[i * mask : (i + 1) * mask] for i in range(len(tables))]
+
+    max_bits = max(c.bit_length() for c, _ in terms)
+    windows = (max_bits + window - 1) // window
+
+    result = JacobianPoint(FE.one(ec.q), FE.one(ec.q), FE.zero(ec.q), True, ec)
+    for w in reversed(range(windows)):
+        if not result.infinity:
+            for _ in range(window):
+                result = double_point_jacobian(result, ec, FE)
+        shift = w * window
+        for (c, _), table in zip(terms, tables):
+            digit = (c >> shift) & mask
+            if digit:
+                result = add_points_jacobian(result, table[digit], ec, FE)
+    return result
+
+
+def __pippenger(terms, ec, FE) -> JacobianPoint:
+    """
+    Pippenger's bucket method, see
+    https://cr.yp.to/papers/pippenger.pdf section 4
+    """
+    terms = list(zip([c for c, _ in terms], normalize([p for _, p in terms])))
+    window = max(2, len(terms).bit_length() - 2)
+    mask = (1 << window) - 1
+    max_bits = max(c.bit_length() for c, _ in terms)
+    windows = (max_bits + window - 1) // window
+
+    infinity = JacobianPoint(FE.one(ec.q), FE.one(ec.q), FE.zero(ec.q), True, ec)
+    result = infinity
+    for w in reversed(range(windows)):
+        if not result.infinity:
+            for _ in range(window):
+                result = double_point_jacobian(result, ec, FE)
+        shift = w * window
+        buckets = [infinity] * (mask + 1)
+        for c, p in terms:
+            digit = (c >> shift) & mask
+            if digit:
+                buckets[digit] = add_points_jacobian(buckets[digit], p, ec, FE)
+
+        # sum(d * bucket[d]) computed as a running sum from the top bucket
+        running = infinity
+        window_sum = infinity
+        for d in range(mask, 0, -1):
+            running = add_points_jacobian(running, buckets[d], ec, FE)
+            window_sum = add_points_jacobian(window_sum, running, ec, FE)
+        result = add_points_jacobian(result, window_sum, ec, FE)
+    return result
+
+
+# Rough size in bytes of a JacobianPoint over Fq held in memory, used to turn
+# a memory budget into a table window.
+POINT_SIZE_ESTIMATE = 640
+
+
+class FixedBaseTable:
+    """
+    Precomputed multiples of a fixed point, table[j][d] = d * 2^(j*window) * P,
+    so that a scalar multiplication is a sum of table lookups without any
+    doublings. The point is assumed to be in the order n subgroup.
+    """
+
+    def __init__(self, point: JacobianPoint, window: int = 4, ec=None):
+        if ec is None:
+            ec = point.ec
+        self.point = point
+        self.window = window
+        self.ec = ec
+        self.FE = point.FE
+        self.bits = ec.n.bit_length()
+
+        self.table = []
+        base = point
+        for _ in range(table_rows(self.bits, window)):
+            row = [None, base]
+            for _ in range(2, 1 << window):
+                row.append(add_points_jacobian(row[-1], base, ec, self.FE))
+            self.table.append(row)
+            for _ in range(window):
+                base = double_point_jacobian(base, ec, self.FE)
+        flat = normalize([p for row in self.table for p in row[1:]])
+        size = (1 << window) - 1
+        self.table = [[None] + flat[i * size : (i + 1) * size] for i in range(len(self.table))]
+
+    def __len__(self) -> int:
+        return len(self.table) * ((1 << self.window) - 1)
+
+    def lookups(self, c: int):
+        """
+        Yields the table entries that add up to c * P.
+        """
+        mask = (1 << self.window) - 1
+        for row in self.table:
+            digit = c & mask
+            if digit:
+                yield row[digit]
+            c >>= self.window
+
+    def mult(self, c) -> JacobianPoint:
+        if isinstance(c, Fq):
+            c = c.value
+        ec, FE = self.ec, self.FE
+        if c < 0 or c.bit_length() > self.bits:
+            return scalar_mult_jacobian(c % ec.n, self.point, ec, FE)
+        result = JacobianPoint(FE.one(ec.q), FE.one(ec.q), FE.zero(ec.q), True, ec)
+        for p in self.lookups(c):
+            result = add_points_jacobian(result, p, ec, FE)
+        return result
+
+
+def table_rows(bits: int, window: int) -> int:
+    return (bits + window - 1) // window
+
+
+def fixed_base_window(count: int, memory_budget: int, bits: int, max_window=8):
+    """
+    Largest table window such that count tables fit in memory_budget bytes,
+    None when not even the smallest window fits.
+    """
+    window = None
+    for w in range(2, max_window + 1):
+        points = count * ((1 << w) - 1) * table_rows(bits, w)
+        if points * POINT_SIZE_ESTIMATE > memory_budget:
+            break
+        window = w
+    return window
+
+
+class FixedBaseMSM:
+    """
+    Multi-scalar multiplication over a fixed list of points, each one
+    with its own FixedBaseTable. The window is the largest one that keeps
+    all tables within memory_budget bytes.
+    """
+
+    def __init__(self, points, memory_budget: int = 16 << 20, ec=None):
+        if len(points) == 0:
+            raise ValueError("at least one point is required")
+        if ec is None:
+            ec = points[0].ec
+        self.ec = ec
+        self.FE = points[0].FE
+        self.window = fixed_base_window(len(points), memory_budget, ec.n.bit_length())
+        if self.window is None:
+            raise ValueError("fixed-base tables do not fit in the memory budget")
+        self.tables = [FixedBaseTable(p, self.window, ec) for p in points]
+
+    def __len__(self) -> int:
+        return len(self.tables)
+
+    def mult(self, scalars) -> JacobianPoint:
+        """
+        Computes sum(c_i * P_i) for the first len(scalars) points.
+        """
+        if len(scalars) > len(self.tables):
+            raise ValueError("more scalars than precomputed points")
+        ec, FE = self.ec, self.FE
+        result = JacobianPoint(FE.one(ec.q), FE.one(ec.q), FE.zero(ec.q), True, ec)
+        for c, table in zip(scalars, self.tables):
+            if isinstance(c, Fq):
+                c = c.value
+            if c < 0 or c.bit_length() > table.bits:
+                result = add_points_jacobian(result, table.mult(c), ec, FE)
+                continue
+            for p in table.lookups(c):
+                result = add_points_jacobian(result, p, ec, FE)
+        return result
+
+
 def untwist(point: AffinePoint, ec=default_ec) -> AffinePoint:
     """
     Given a point on G2 on the twisted curve, this converts its
@@ -0,0 +1,152 @@
+"""
+Este modulo contem a aritmetica de polinomios sobre o corpo dos escalares,
+com multiplicacao por NTT e divisao por inversao de Newton para graus altos
+"""
+
+from __future__ import annotations
+
+from bib.bls12381 import n
+from bib.polynomial import evaluate, evaluate_many, polynomial_divmod, polynomial_multiply
+
+# Below this quotient and divisor length schoolbook long division beats
+# Newton inversion
+NEWTON_THRESHOLD = 256
+
+
+class FieldPolynomial:
+    """
+    Immutable polynomial mod n, coefficients lowest degree first without
+    trailing zeros. Every operation returns a new polynomial.
+    """
+
+    __slots__ = ("coefficients",)
+
+    def __init__(self, coefficients=()):
+        coefficients = [c % n for c in coefficients]
+        while coefficients and not coefficients[-1]:
+            coefficients.pop()
+        self.coefficients = coefficients
+
+    @staticmethod
+    def vanishing(points) -> FieldPolynomial:
+        """
+        Z(x) = prod(x - x_i), multiplying the linear factors pairwise so
+        that the large products go through the NTT.
+        """
+        factors = [FieldPolynomial([-x, 1]) for x in points]
+        if not factors:
+            return FieldPolynomial([1])
+        while len(factors) > 1:
+            paired = [a * b for a, b in zip(factors[::2], factors[1::2])]
+            if len(factors) % 2:
+                paired.append(factors[-1])
+            factors = paired
+        return factors[0]
+
+    def degree(self) -> int:
+        """
+        Degree of the polynomial, -1 for the zero polynomial.
+        """
+        return len(self.coefficients) - 1
+
+    def __len__(self):
+        return len(self.coefficients)
+
+    def __bool__(self):
+        return bool(self.coefficients)
+
+    def __eq__(self, other):
+        if isinstance(other, int):
+            other = FieldPolynomial([other])
+        if not isinstance(other, FieldPolynomial):
+            return NotImplemented
+        return self.coefficients == other.coefficients
+
+    def __hash__(self):
+        return hash(tuple(self.coefficients))
+
+    def __repr__(self):
+        return "FieldPolynomial(%r)" % self.coefficients
+
+    def __call__(self, x: int) -> int:
+        return evaluate(self.coefficients, x)
+
+    def evaluate_many(self, points) -> list:
+        return evaluate_many(self.coefficients, list(points))
+
+    def __neg__(self):
+        return FieldPolynomial([-c for c in self.coefficients])
+
+    def __add__(self, other):
+        if isinstance(other, int):
+            other = FieldPolynomial([other])
+        if not isinstance(other, FieldPolynomial):
+            return NotImplemented
+        a, b = self.coefficients, other.coefficients
+        if len(a) < len(b):
+            a, b = b, a
+        return FieldPolynomial([x + y for x, y in zip(a, b)] + a[len(b) :])
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if isinstance(other, int):
+            other = FieldPolynomial([other])
+        if not isinstance(other, FieldPolynomial):
+            return NotImplemented
+        return self + (-other)
+
+    def __rsub__(self, other):
+        return (-self) + other
+
+    def __mul__(self, other):
+        if isinstance(other, int):
+            return FieldPolynomial([c * other for c in self.coefficients])
+        if not isinstance(other, FieldPolynomial):
+            return NotImplemented
+        return FieldPolynomial(polynomial_multiply(self.coefficients, other.coefficients))
+
+    __rmul__ = __mul__
+
+    def __divmod__(self, other):
+        if not isinstance(other, FieldPolynomial):
+            return NotImplemented
+        if not other:
+            raise ZeroDivisionError("polynomial division by zero")
+        a, b = self.coefficients, other.coefficients
+        if len(a) < len(b):
+            return FieldPolynomial(), self
+        if min(len(a) - len(b) + 1, len(b)) < NEWTON_THRESHOLD:
+            quotient, remainder = polynomial_divmod(a, b)
+            return FieldPolynomial(quotient), FieldPolynomial(remainder)
+        quotient = FieldPolynomial(_newton_quotient(a, b))
+        return quotient, self - quotient * other
+
+    def __floordiv__(self, other):
+        return divmod(self, other)[0]
+
+    def __mod__(self, other):
+        return divmod(self, other)[1]
+
+
+def _inverse_series(f, length):
+    # g with f * g = 1 mod x^length, doubling the precision of
+    # g <- g * (2 - f * g) at every step
+    g = [pow(f[0], -1, n)]
+    precision = 1
+    while precision < length:
+        precision = min(2 * precision, length)
+        fg = polynomial_multiply(f[:precision], g)[:precision]
+        correction = [-c for c in fg]
+        correction[0] += 2
+        g = [c % n for c in polynomial_multiply(g, correction)[:precision]]
+    return g
+
+
+def _newton_quotient(a, b):
+    # rev(q) = rev(a) / rev(b) mod x^(deg a - deg b + 1)
+    length = len(a) - len(b) + 1
+    inverse = _inverse_series(b[::-1], length)
+    quotient = polynomial_multiply(a[::-1][:length], inverse)[:length]
+    quotient += [0] * (length - len(quotient))
+    return quotient[::-1]
@@ -11,8 +11,13 @@ from typing import Any
 class Fq:
     """
     Represents an element of a finite field mod a prime q.
+    Values are always kept reduced in [0, q), so additions and
+    subtractions only need a conditional correction instead of a
+    full modular reduction.
     """
 
+    __slots__ = ("Q", "value")
+
     value: int
     extension: int = 1
 
@@ -21,12 +26,15 @@ class Fq:
         self.value = value % Q
 
     def __neg__(self) -> Fq:
-        return Fq(self.Q, -self.value)
+        return _reduced(self.Q, self.Q - self.value if self.value else 0)
 
     def __add__(self, other: Fq) -> Fq:
         if not isinstance(other, Fq):
             return NotImplemented
-        return Fq(self.Q, self.value + other.value)
+        value = self.value + other.value
+        if value >= self.Q:
+            value -= self.Q
+        return _reduced(self.Q, value)
 
     def __radd__(self, other: Fq) -> Fq:
         if not isinstance(other, Fq):
@@ -36,17 +44,22 @@ class Fq:
     def __sub__(self, other: Fq) -> Fq:
         if not isinstance(other, Fq):
             return NotImplemented
-        return Fq(self.Q, self.value - other.value)
+        value = self.value - other.value
+        if value < 0:
+            value += self.Q
+        return _reduced(self.Q, value)
 
     def __rsub__(self, other: Fq) -> Fq:
         if not isinstance(other, Fq):
             return NotImplemented
-        return Fq(self.Q, other.value - self.value)
+        return other.__sub__(self)
 
     def __mul__(self, other: Fq) -> Fq:
+        if isinstance(other, int):
+            return _reduced(self.Q, self.value * other % self.Q)
         if not isinstance(other, Fq):
             return NotImplemented
-        return Fq(self.Q, self.value * other.value)
+        return _reduced(self.Q, self.value * other.value % self.Q)
 
     def __rmul__(self, other: Fq) -> Fq:
         return self.__mul__(other)
@@ -86,30 +99,24 @@ class Fq:
         return Fq(q, int.from_bytes(buffer, "big"))
 
     def __pow__(self, other) -> Fq:
-        if other == 0:
-            return Fq(self.Q, 1)
-        elif other == 1:
-            return Fq(self.Q, self.value)
-        elif other % 2 == 0:
-            return Fq(self.Q, self.value * self.value) ** (other // 2)
-        else:
-            return Fq(self.Q, self.value * self.value) ** (other // 2) * self
+        return _reduced(self.Q, pow(self.value, other, self.Q))
 
     def qi_power(self, i: int) -> Fq:
         return self
 
+    def __bool__(self) -> bool:
+        return self.value != 0
+
+    def square(self) -> Fq:
+        return _reduced(self.Q, self.value * self.value % self.Q)
+
     def __invert__(self) -> Fq:
         """
-        Extended euclidian algorithm for inversion.
+        Extended euclidian algorithm for inversion, zero maps to zero.
         """
-        x0, x1, y0, y1 = 1, 0, 0, 1
-        a = int(self.Q)
-        b = int(self.value)
-        while a != 0:
-            q, b, a = b // a, a, b % a
-            x0, x1 = x1, x0 - q * x1
-            y0, y1 = y1, y0 - q * y1
-        return Fq(self.Q, x0)
+        if not self.value:
+            return _reduced(self.Q, 0)
+        return _reduced(self.Q, pow(self.value, -1, self.Q))
 
     def __floordiv__(self, other) -> Fq:
         if isinstance(other, int) and not isinstance(other, type(self)):
@@ -168,7 +175,7 @@ class Fq:
             R = (R * b) % self.Q
 
     def __deepcopy__(self, memo) -> Fq:
-        return Fq(self.Q, self.value)
+        return _reduced(self.Q, self.value)
 
     @classmethod
     def zero(cls, Q: int) -> Fq:
@@ -183,6 +190,19 @@ class Fq:
         return fq
 
 
+def _reduced(Q: int, value: int) -> Fq:
+    """
+    Builds an Fq from a value already in [0, Q), skipping the reduction.
+    """
+    ret = _new_object(Fq)
+    ret.Q = Q
+    ret.value = value
+    return ret
+
+
+_new_object = object.__new__
+
+
 class FieldExtBase(tuple):
     """
     Represents an extension of a field (or extension of an extension).
@@ -242,6 +262,8 @@ class FieldExtBase(tuple):
         return self.__add__(other)
 
     def __sub__(self, other):
+        if isinstance(other, type(self)):
+            return self._new(a - b for a, b in zip(self, other))
         return self + (-other)
 
     def __rsub__(self, other):
@@ -355,11 +377,25 @@ class FieldExtBase(tuple):
             if e & 1:
                 ans *= base
 
-            base *= base
             e >>= 1
+            if e:
+                base = base.square()
 
         return ans
 
+    def square(self):
+        return self * self
+
+    def _new(self, coefficients):
+        """
+        Builds an element of the same field as self, skipping the
+        argument checks done by __new__.
+        """
+        ret = tuple.__new__(type(self), coefficients)
+        ret.Q = self.Q
+        ret.root = self.root
+        return ret
+
     def __bool__(self):
         return any(x for x in self)
 
@@ -430,10 +466,28 @@ class Fq2(FieldExtBase):
         ret = Fq2(self.Q, a * factor, -b * factor)
         return ret
 
+    def __mul__(self, other):
+        if isinstance(other, Fq):
+            return self._new((self[0] * other, self[1] * other))
+        if not isinstance(other, Fq2):
+            return super().__mul__(other)
+        # Karatsuba, 3 base field multiplications
+        a0, a1 = self
+        b0, b1 = other
+        t0 = a0 * b0
+        t1 = a1 * b1
+        return self._new((t0 - t1, (a0 + a1) * (b0 + b1) - t0 - t1))
+
+    def square(self) -> Fq2:
+        # Complex squaring, (a0 + a1)(a0 - a1) + 2 a0 a1 u
+        a0, a1 = self
+        t = a0 * a1
+        return self._new(((a0 + a1) * (a0 - a1), t + t))
+
     def mul_by_nonresidue(self) -> Fq2:
         # multiply by u + 1
         a, b = self
-        return Fq2(self.Q, a - b, a + b)
+        return self._new((a - b, a + b))
 
     def modsqrt(self) -> Fq2:
         """
@@ -443,7 +497,10 @@ class Fq2(FieldExtBase):
         """
         a0, a1 = self
         if a1 == Fq.zero(self.Q):
-            return a0.modsqrt()
+            # sqrt(a0) is either in Fq or a multiple of u, as u^2 = -1
+            if pow(a0.value, (self.Q - 1) // 2, self.Q) == self.Q - 1:
+                return Fq2(self.Q, Fq.zero(self.Q), (-a0).modsqrt())
+            return Fq2(self.Q, a0.modsqrt(), Fq.zero(self.Q))
         alpha = pow(a0, 2) + pow(a1, 2)
         gamma = pow(alpha, (self.Q - 1) // 2)
         if gamma == Fq(self.Q, -1):
@@ -478,10 +535,54 @@ class Fq6(FieldExtBase):
 
         return Fq6(self.Q, g0 * factor, g1 * factor, g2 * factor)
 
+    def __mul__(self, other):
+        if not isinstance(other, Fq6):
+            return super().__mul__(other)
+        # Karatsuba over Fq2, 6 Fq2 multiplications
+        a0, a1, a2 = self
+        b0, b1, b2 = other
+        t0 = a0 * b0
+        t1 = a1 * b1
+        t2 = a2 * b2
+        c0 = ((a1 + a2) * (b1 + b2) - t1 - t2).mul_by_nonresidue() + t0
+        c1 = (a0 + a1) * (b0 + b1) - t0 - t1 + t2.mul_by_nonresidue()
+        c2 = (a0 + a2) * (b0 + b2) - t0 - t2 + t1
+        return self._new((c0, c1, c2))
+
+    def square(self) -> Fq6:
+        # Chung-Hasan SQR2, https://eprint.iacr.org/2006/471.pdf
+        a0, a1, a2 = self
+        s0 = a0.square()
+        t = a0 * a1
+        s1 = t + t
+        s2 = (a0 - a1 + a2).square()
+        t = a1 * a2
+        s3 = t + t
+        s4 = a2.square()
+        c0 = s3.mul_by_nonresidue() + s0
+        c1 = s4.mul_by_nonresidue() + s1
+        c2 = s1 + s2 + s3 - s0 - s4
+        return self._new((c0, c1, c2))
+
+    def mul_by_01(self, b0: Fq2, b1: Fq2) -> Fq6:
+        # multiply by b0 + b1 v
+        a0, a1, a2 = self
+        t0 = a0 * b0
+        t1 = a1 * b1
+        c0 = ((a1 + a2) * b1 - t1).mul_by_nonresidue() + t0
+        c1 = (a0 + a1) * (b0 + b1) - t0 - t1
+        c2 = (a0 + a2) * b0 - t0 + t1
+        return self._new((c0, c1, c2))
+
+    def mul_by_1(self, b1: Fq2) -> Fq6:
+        # multiply by b1 v
+        a0, a1, a2 = self
+        return self._new(((a2 * b1).mul_by_nonresidue(), a0 * b1, a1 * b1))
+
     def mul_by_nonresidue(self) -> Fq6:
         # multiply by v
         a, b, c = self
-        return Fq6(self.Q, c * self.root, a, b)
+        return self._new((c.mul_by_nonresidue(), a, b))
 
 
 class Fq12(FieldExtBase):
@@ -493,12 +594,114 @@ class Fq12(FieldExtBase):
     def __init__(self, Q, *args):
         super().set_root(Fq6(Q, Fq2.zero(Q), Fq2.one(Q), Fq2.zero(Q)))
 
+    def __mul__(self, other):
+        if not isinstance(other, Fq12):
+            return super().__mul__(other)
+        # Karatsuba over Fq6, 3 Fq6 multiplications
+        a0, a1 = self
+        b0, b1 = other
+        t0 = a0 * b0
+        t1 = a1 * b1
+        c0 = t1.mul_by_nonresidue() + t0
+        c1 = (a0 + a1) * (b0 + b1) - t0 - t1
+        return self._new((c0, c1))
+
+    def square(self) -> Fq12:
+        # Complex squaring over Fq6, 2 Fq6 multiplications
+        a0, a1 = self
+        t = a0 * a1
+        c0 = (a0 + a1) * (a0 + a1.mul_by_nonresidue()) - t - t.mul_by_nonresidue()
+        return self._new((c0, t + t))
+
+    def mul_by_014(self, c0: Fq2, c1: Fq2, c4: Fq2) -> Fq12:
+        """
+        Multiplies by the sparse element (c0 + c1 v) + (c4 v) w, which is
+        the shape of the Miller loop line functions.
+        """
+        a0, a1 = self
+        t0 = a0.mul_by_01(c0, c1)
+        t1 = a1.mul_by_1(c4)
+        r1 = (a0 + a1).mul_by_01(c0, c1 + c4) - t0 - t1
+        return self._new((t1.mul_by_nonresidue() + t0, r1))
+
+    def conjugate(self) -> Fq12:
+        # Same as qi_power(6), the inverse of elements in the cyclotomic subgroup
+        a, b = self
+        return self._new((a, -b))
+
+    def cyclotomic_square(self) -> Fq12:
+        """
+        Granger-Scott squaring, only valid for elements of the cyclotomic
+        subgroup (e.g. after the easy part of the final exponentiation).
+        See https://eprint.iacr.org/2009/565.pdf section 3.2
+        """
+        (z0, z4, z3), (z2, z1, z5) = self
+
+        t0, t1 = _fq4_square(z0, z1)
+        z0 = t0 - z0
+        z0 = z0 + z0 + t0
+        z1 = t1 + z1
+        z1 = z1 + z1 + t1
+
+        t0, t1 = _fq4_square(z2, z3)
+        t2, t3 = _fq4_square(z4, z5)
+
+        z4 = t0 - z4
+        z4 = z4 + z4 + t0
+        z5 = t1 + z5
+        z5 = z5 + z5 + t1
+
+        t0 = t3.mul_by_nonresidue()
+        z2 = t0 + z2
+        z2 = z2 + z2 + t0
+        z3 = t2 - z3
+        z3 = z3 + z3 + t2
+
+        c0, c1 = self
+        return self._new((c0._new((z0, z4, z3)), c1._new((z2, z1, z5))))
+
     def __invert__(self) -> Fq12:
         a, b = self
-        factor = ~(a * a - (b * b).mul_by_nonresidue())
+        factor = ~(a.square() - b.square().mul_by_nonresidue())
         return Fq12(self.Q, a * factor, -b * factor)
 
 
+def batch_invert(elements):
+    """
+    Inverts all elements with a single field inversion (Montgomery's
+    trick). Zeros are left as zero.
+    """
+    result = list(elements)
+    nonzero = [i for i, x in enumerate(result) if x]
+    if not nonzero:
+        return result
+
+    # prefix[k] = product of the first k + 1 nonzero elements
+    prefix = [result[nonzero[0]]]
+    for i in nonzero[1:]:
+        prefix.append(prefix[-1] * result[i])
+
+    inverse = ~prefix[-1]
+    for k in range(len(nonzero) - 1, 0, -1):
+        i = nonzero[k]
+        x = result[i]
+        result[i] = inverse * prefix[k - 1]
+        inverse = inverse * x
+    result[nonzero[0]] = inverse
+    return result
+
+
+def _fq4_square(a: Fq2, b: Fq2):
+    """
+    Squares a + b t in Fq4 = Fq2(t) / (t^2 - ξ).
+    """
+    t0 = a.square()
+    t1 = b.square()
+    c0 = t1.mul_by_nonresidue() + t0
+    c1 = (a + b).square() - t0 - t1
+    return c0, c1
+
+
 # Because fields aren't done with metaclasses, and we need to
 # avoid circular imports, we put a hack here for bls12381 for now.
 bls12381_q = q = (
@@ -0,0 +1,103 @@
+"""
+Este modulo contem a transformada de Fourier sobre o corpo dos escalares (NTT),
+usada para interpolar e avaliar polinomios em dominios de raizes da unidade
+"""
+
+from functools import lru_cache
+
+from bib.bls12381 import n
+
+# n - 1 = 2^32 * odd, so there are roots of unity of every order 2^k, k <= 32
+TWO_ADICITY = 32
+# Generator of the multiplicative group of the scalar field
+GENERATOR = 7
+# Primitive 2^32-th root of unity
+ROOT_OF_UNITY = pow(GENERATOR, (n - 1) >> TWO_ADICITY, n)
+
+
+def root_of_unity(size: int, prime=n) -> int:
+    """
+    Primitive root of unity of order size, a power of two.
+    """
+    assert prime == n, "only the BLS12-381 scalar field is supported"
+    log_size = size.bit_length() - 1
+    if size != 1 << log_size or log_size > TWO_ADICITY:
+        raise ValueError("size must be a power of two up to 2^32")
+    return pow(ROOT_OF_UNITY, 1 << (TWO_ADICITY - log_size), prime)
+
+
+class RootsOfUnityDomain:
+    """
+    Domain of the size-th roots of unity 1, w, w^2, ..., with the twiddle
+    tables precomputed, so interpolating and evaluating on all points are
+    O(size log size) radix-2 NTTs.
+    """
+
+    def __init__(self, size: int, prime=n):
+        self.prime = prime
+        self.omega = root_of_unity(size, prime)
+        self.points = _powers(self.omega, size, prime)
+        self.size_inverse = pow(size, -1, prime)
+        self.__twiddles = self.points[: size // 2]
+        self.__inverse_twiddles = [1] + self.points[: size // 2 : -1]
+        self.__bit_reversal = _bit_reversal(size)
+
+    def __len__(self):
+        return len(self.points)
+
+    def evaluate(self, coefficients):
+        """
+        Values of the polynomial at every point of the domain. Polynomials
+        with more coefficients than points are reduced mod x^size - 1.
+        """
+        size = len(self.points)
+        values = [0] * size
+        for i, c in enumerate(coefficients):
+            values[i % size] += c
+        return self.__ntt(values, self.__twiddles)
+
+    def interpolate(self, values):
+        """
+        Coefficients, lowest degree first, of the polynomial of degree
+        < len(self) taking the given values at the domain points.
+        """
+        assert len(values) == len(self.points), "one value per point"
+        coefficients = self.__ntt(list(values), self.__inverse_twiddles)
+        return [c * self.size_inverse % self.prime for c in coefficients]
+
+    def __ntt(self, values, twiddles):
+        # Iterative Cooley-Tukey, bit reversed input, natural order output
+        p = self.prime
+        size = len(values)
+        a = [values[i] % p for i in self.__bit_reversal]
+        half = 1
+        while half < size:
+            stride = size // (half + half)
+            for start in range(0, size, half + half):
+                for j in range(half):
+                    u = a[start + j]
+                    v = a[start + j + half] * twiddles[j * stride] % p
+                    a[start + j] = (u + v) % p
+                    a[start + j + half] = (u - v) % p
+            half += half
+        return a
+
+
+@lru_cache(maxsize=None)
+def get_roots_domain(size: int, prime=n) -> RootsOfUnityDomain:
+    """
+    Cached domain of the size-th roots of unity.
+    """
+    return RootsOfUnityDomain(size, prime)
+
+
+def _powers(x, count, prime):
+    powers = [1] * count
+    for i in range(1, count):
+        powers[i] = powers[i - 1] * x % prime
+    return powers
+
+
+def _bit_reversal(size):
+    bits = size.bit_length() - 1
+    return [int(format(i, "0%db" % bits)[::-1], 2) if bits else 0 for i in range(size)]
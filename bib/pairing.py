@@ -3,8 +3,8 @@ Este modulo contem o arcabouco necessario para calcular o bilinear pairing
 """
 
 from typing import List
-from bib.ec import AffinePoint, JacobianPoint, untwist, default_ec
-from bib.fields import Fq, Fq12
+from bib.ec import AffinePoint, JacobianPoint, default_ec
+from bib.fields import Fq12
 
 # Struct for elliptic curve parameters
 
@@ -19,87 +19,183 @@ def __int_to_bits(i: int) -> List[int]:
     return list(reversed(bits))
 
 
-def __double_line_eval(R: AffinePoint, P: AffinePoint, ec):
+def __double_step(R, b):
     """
-    Creates an equation for a line tangent to R,
-    and evaluates this at the point P. f(x) = y - sv - v.
-    f(P).
+    Doubles R = (X, Y, Z), in homogeneous projective coordinates on the
+    twist y^2 = x^3 + b, and returns the coefficients of the tangent line.
+    See https://eprint.iacr.org/2010/354.pdf section 4, scaled by 4 to
+    avoid halvings.
     """
-    R12 = untwist(R)
-
-    slope = (Fq(ec.q, 3) * (R12.x**2) + ec.a) / (Fq(ec.q, 2) * R12.y)
-    v = R12.y - slope * R12.x
-
-    return P.y - P.x * slope - v
+    X, Y, Z = R
+    B = Y.square()
+    C = Z.square()
+    E = b * (C + C + C)
+    F = E + E + E
+    H = (Y + Z).square() - B - C
+    X2 = X * X
+    T = X * Y
+
+    X3 = (T + T) * (B - F)
+    Y3 = (B + F).square() - (E.square() + E.square() + E.square()) * 4
+    Z3 = B * H * 4
+    return (X3, Y3, Z3), (B - E, -(X2 + X2 + X2), H)
+
+
+def __add_step(R, Q: AffinePoint):
+    """
+    Adds the affine point Q to R = (X, Y, Z), in homogeneous projective
+    coordinates on the twist, and returns the coefficients of the line
+    through both points. See https://eprint.iacr.org/2010/354.pdf section 4.
+    """
+    X, Y, Z = R
+    theta = Y - Q.y * Z
+    lamb = X - Q.x * Z
+    C = theta.square()
+    D = lamb.square()
+    E = lamb * D
+    F = Z * C
+    G = X * D
+    H = E + F - G - G
+
+    X3 = lamb * H
+    Y3 = theta * (G - H) - Y * E
+    Z3 = Z * E
+    return (X3, Y3, Z3), (theta * Q.x - lamb * Q.y, -theta, lamb)
+
+
+def __ell(f: Fq12, line, P: AffinePoint) -> Fq12:
+    """
+    Multiplies f by the line evaluated at P. Untwisting the line and
+    clearing the w^3 denominator leaves ell_0 + ell_vv * xP v + ell_vw * yP vw.
+    """
+    ell_0, ell_vv, ell_vw = line
+    return f.mul_by_014(ell_0, ell_vv * P.x, ell_vw * P.y)
 
 
-def __add_line_eval(R: AffinePoint, Q: AffinePoint, P: AffinePoint, ec) -> Fq:
+class G2Prepared:
     """
-    Creates an equation for a line between R and Q,
-    and evaluates this at the point P. f(x) = y - sv - v.
-    f(P).
+    Miller loop line coefficients for a fixed G2 point, in the order the
+    loop consumes them. Pairings against it never redo the G2 side
+    doublings and additions. Built with prepare_g2.
     """
-    R12 = untwist(R)
-    Q12 = untwist(Q)
 
-    # This is the case of a vertical line, where the denominator
-    # will be 0.
-    if R12 == Q12.negate():
-        return P.x - R12.x
+    def __init__(self, coefficients, infinity: bool):
+        self.coefficients = coefficients
+        self.infinity = infinity
 
-    slope = (Q12.y - R12.y) / (Q12.x - R12.x)
-    v = (Q12.y * R12.x - R12.y * Q12.x) / (R12.x - Q12.x)
 
-    return P.y - P.x * slope - v
+def prepare_g2(Q) -> G2Prepared:
+    """
+    Runs the G2 side of the Miller loop for Q and stores its lines.
+    """
+    if Q.infinity:
+        return G2Prepared([], True)
+    Q = Q.to_affine() if isinstance(Q, JacobianPoint) else Q
+    ec = default_ec
+    T_bits = __int_to_bits(abs(ec.x))
+    R = (Q.x, Q.y, Q.FE.one(ec.q))
+    coefficients = []
+    for i in range(1, len(T_bits)):
+        R, line = __double_step(R, Q.ec.b)
+        coefficients.append(line)
+        if T_bits[i] == 1:
+            R, line = __add_step(R, Q)
+            coefficients.append(line)
+    return G2Prepared(coefficients, False)
 
 
-def __miller_loop(T: int, P: AffinePoint, Q: AffinePoint, ec) -> Fq12:
+def __miller_loop(T: int, pairs, ec) -> Fq12:
     """
-    Performs a double and add algorithm for the ate pairing. This algorithm
-    is taken from Craig Costello's "Pairing for Beginners".
+    Performs a double and add algorithm for the ate pairing, for all the
+    (P, prepared Q) pairs at once so that they share the squarings of f.
+    The lines come from the prepared G2 points, so this only evaluates
+    them at P and multiplies them into f.
     """
     T_bits = __int_to_bits(T)
-    R = Q
     f = Fq12.one(ec.q)  # f is an element of Fq12
+    j = 0
     for i in range(1, len(T_bits)):
-        # Compute sloped line lrr
-        lrr = __double_line_eval(R, P, ec)
-        f = f * f * lrr
-
-        R = Fq(ec.q, 2) * R
+        f = f.square()
+        for P, Q in pairs:
+            f = __ell(f, Q.coefficients[j], P)
+        j += 1
         if T_bits[i] == 1:
-            # Compute sloped line lrq
-            lrq = __add_line_eval(R, Q, P, ec)
-            f = f * lrq
-
-            R = R + Q
+            for P, Q in pairs:
+                f = __ell(f, Q.coefficients[j], P)
+            j += 1
     return f
 
 
+def __exp_by_x(f: Fq12, ec) -> Fq12:
+    """
+    Raises f, an element of the cyclotomic subgroup, to the BLS
+    parameter x, using cyclotomic squarings.
+    """
+    ans = Fq12.one(ec.q)
+    for bit in __int_to_bits(abs(ec.x)):
+        ans = ans.cyclotomic_square()
+        if bit:
+            ans = ans * f
+    if ec.x < 0:
+        ans = ans.conjugate()
+    return ans
+
+
 def __final_exponentiation(element: Fq12, ec) -> Fq12:
     """
     Performs a final exponentiation to map the result of the Miller
     loop to a unique element of Fq12.
     """
     if ec.k == 12:
-        ans = element ** ((pow(ec.q, 4) - pow(ec.q, 2) + 1) // ec.n)
-        ans = ans.qi_power(2) * ans
-        ans = ans.qi_power(6) / ans
-        return ans
+        # Easy part, f^((q^6 - 1)(q^2 + 1)), lands in the cyclotomic subgroup
+        f = element.conjugate() / element
+        f = f.qi_power(2) * f
+        # Hard part, using 3 (q^4 - q^2 + 1) / n =
+        # (x - 1)^2 (x + q) (x^2 + q^2 - 1) + 3, see
+        # https://eprint.iacr.org/2020/875.pdf. The result is the cube of
+        # the reduced pairing, which is still bilinear and non-degenerate.
+        a = __exp_by_x(f, ec) * f.conjugate()
+        a = __exp_by_x(a, ec) * a.conjugate()
+        b = __exp_by_x(a, ec) * a.qi_power(1)
+        c = __exp_by_x(__exp_by_x(b, ec), ec) * b.qi_power(2) * b.conjugate()
+        return c * f.cyclotomic_square() * f
     else:
         return element ** ((pow(ec.q, ec.k) - 1) // ec.n)
 
 
-def tate_pairing(P: JacobianPoint, Q: JacobianPoint) -> Fq12:
+def multi_pairing(pairs) -> Fq12:
     """
-    Performs one ate pairing.
+    Computes the product of the ate pairings of all (P, Q) pairs, with
+    interleaved Miller loops and a single final exponentiation. Each Q
+    may be a G2 point or a G2Prepared.
     """
+    pairs = [
+        (P.to_affine(), Q if isinstance(Q, G2Prepared) else prepare_g2(Q))
+        for P, Q in pairs
+        if not P.infinity and not Q.infinity
+    ]
+    if not pairs:
+        return Fq12.one(default_ec.q)
     t = default_ec.x + 1
     T = abs(t - 1)
-    element = __miller_loop(T, P.to_affine(), Q.to_affine(), default_ec)
+    element = __miller_loop(T, pairs, default_ec)
     return __final_exponentiation(element, default_ec)
 
 
+def pairing_product_is_one(pairs) -> bool:
+    """
+    Checks that the product of the ate pairings of all (P, Q) pairs is one.
+    """
+    return multi_pairing(pairs) == Fq12.one(default_ec.q)
+
+
+def tate_pairing(P: JacobianPoint, Q: JacobianPoint) -> Fq12:
+    """
+    Performs one ate pairing.
+    """
+    return multi_pairing([(P, Q)])
+
+
 """
 Copyright 2020 Chia Network Inc
 
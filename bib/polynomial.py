@@ -2,17 +2,208 @@
 Este modulo contem o arcabouco necessario para operacoes aritimeticas com polinomios
 """
 
+from functools import lru_cache
+
 from bib.bls12381 import n, MINUS1
+from bib.ntt import get_roots_domain
 
 
 def lagrange_polynomial(points, prime=n):
-    return __interpolate_polynomial(
-        [i[0] for i in points], [k[1] for k in points], prime
-    )
+    x = [i[0] for i in points]
+    y = [k[1] for k in points]
+    if x == list(range(len(x))):
+        domain = get_domain(len(x), prime)
+    else:
+        domain = EvaluationDomain(x, prime)
+    return domain.interpolate(y)
+
+
+class EvaluationDomain:
+    """
+    Fixed set of interpolation points with the coefficients of its
+    Lagrange basis precomputed mod prime, so interpolating is a single
+    matrix-vector product.
+    """
+
+    def __init__(self, points, prime=n):
+        self.points = list(points)
+        self.prime = prime
+        basis = _lagrange_basis(self.points, prime)
+        # transposed, row i holds the x^i coefficient of every basis polynomial
+        self.__matrix = [list(row) for row in zip(*basis)]
+
+    def __len__(self):
+        return len(self.points)
+
+    def interpolate(self, values):
+        """
+        Coefficients, lowest degree first, of the polynomial of degree
+        < len(self) taking the given values at the domain points.
+        """
+        assert len(values) == len(self.points), "one value per point"
+        p = self.prime
+        return [sum(c * v for c, v in zip(row, values)) % p for row in self.__matrix]
+
+
+@lru_cache(maxsize=None)
+def get_domain(size, prime=n):
+    """
+    Cached domain of the points 0, 1, ..., size - 1.
+    """
+    return EvaluationDomain(range(size), prime)
+
+
+def vanishing_polynomial(points, prime=n):
+    """
+    Z(x) = prod(x - x_i), coefficients lowest degree first.
+    """
+    Z = [1]
+    for xm in points:
+        Z = [(a - xm * b) % prime for a, b in zip([0] + Z, Z + [0])]
+    return Z
+
+
+def _lagrange_basis(points, prime):
+    Z = vanishing_polynomial(points, prime)
+
+    basis = []
+    for xj in points:
+        # Z(x) / (x - x_j) by synthetic division
+        quotient = [0] * (len(Z) - 1)
+        acc = 0
+        for i in range(len(Z) - 1, 0, -1):
+            acc = (Z[i] + xj * acc) % prime
+            quotient[i - 1] = acc
+        denominator = 0
+        for c in reversed(quotient):
+            denominator = (denominator * xj + c) % prime
+        inverse = pow(denominator, -1, prime)
+        basis.append([c * inverse % prime for c in quotient])
+    return basis
+
+
+# Below this many coefficients Horner on each point beats the subproduct tree
+SUBPRODUCT_THRESHOLD = 192
+# Below this many coefficients in the smaller factor schoolbook
+# multiplication beats the NTT
+NTT_THRESHOLD = 64
+
+
+def evaluate(coefficients, x, prime=n):
+    """
+    Horner evaluation, reducing at every step.
+    """
+    acc = 0
+    for c in reversed(coefficients):
+        acc = (acc * x + c) % prime
+    return acc
+
+
+def evaluate_many(coefficients, points, prime=n):
+    """
+    Evaluates one polynomial at many points, with Horner for low degrees
+    and, for high ones, a subproduct tree (remainders by prod(x - x_i) down
+    the tree) over blocks of about as many points as coefficients.
+    """
+    size = len(coefficients)
+    if size < SUBPRODUCT_THRESHOLD or len(points) < SUBPRODUCT_THRESHOLD:
+        return [evaluate(coefficients, x, prime) for x in points]
+    values = []
+    for start in range(0, len(points), size):
+        values += _evaluate_tree(coefficients, points[start : start + size], prime)
+    return values
+
+
+def _evaluate_tree(coefficients, points, prime):
+    tree = _subproduct_tree(points, prime)
+    remainders = [_remainder(coefficients, tree[-1][0], prime)]
+    for level in reversed(tree[:-1]):
+        remainders = [
+            _remainder(remainders[i // 2], node, prime) for i, node in enumerate(level)
+        ]
+    return [r[0] if r else 0 for r in remainders]
+
+
+def _subproduct_tree(points, prime):
+    # leaves are x - x_i, every node is the product of its two children
+    level = [[-x % prime, 1] for x in points]
+    tree = [level]
+    while len(level) > 1:
+        level = [
+            polynomial_multiply(level[i], level[i + 1], prime)
+            if i + 1 < len(level)
+            else level[i]
+            for i in range(0, len(level), 2)
+        ]
+        tree.append(level)
+    return tree
+
+
+def polynomial_multiply(a, b, prime=n):
+    """
+    Product of two polynomials, coefficients lowest degree first, with
+    schoolbook multiplication for small factors and the roots of unity
+    NTT for large ones.
+    """
+    if not a or not b:
+        return []
+    length = len(a) + len(b) - 1
+    if min(len(a), len(b)) < NTT_THRESHOLD or prime != n:
+        result = [0] * length
+        for i, x in enumerate(a):
+            if x:
+                for j, y in enumerate(b):
+                    result[i + j] += x * y
+        return [c % prime for c in result]
+    domain = get_roots_domain(1 << (length - 1).bit_length())
+    values = [x * y % n for x, y in zip(domain.evaluate(a), domain.evaluate(b))]
+    return domain.interpolate(values)[:length]
+
+
+def _remainder(a, b, prime):
+    # remainder of a by the monic polynomial b
+    r = list(a)
+    degree = len(b) - 1
+    for i in range(len(r) - 1, degree - 1, -1):
+        c = r[i] % prime
+        if c:
+            for j in range(degree):
+                r[i - degree + j] -= c * b[j]
+    return [c % prime for c in r[:degree]]
+
+
+def polynomial_divmod(polynomial, divisor, prime=n):
+    """
+    Quotient and remainder of polynomial by divisor, both lists of
+    coefficients lowest degree first. The inputs are not modified.
+    """
+    divisor = list(divisor)
+    while divisor and divisor[-1] % prime == 0:
+        divisor.pop()
+    if not divisor:
+        raise ZeroDivisionError("polynomial division by zero")
+    degree = len(divisor) - 1
+    lead_inverse = pow(divisor[-1], -1, prime)
+    r = [c % prime for c in polynomial]
+    quotient = [0] * max(len(r) - degree, 0)
+    for i in range(len(r) - 1, degree - 1, -1):
+        c = r[i] * lead_inverse % prime
+        if c:
+            quotient[i - degree] = c
+            for j in range(degree):
+                r[i - degree + j] = (r[i - degree + j] - c * divisor[j]) % prime
+    return quotient, r[:degree]
 
 
 def polynomial_division(polynomial, divisor):
-    polynomial.reverse()
+    """
+    Quotient of polynomial by divisor, either a list of coefficients
+    lowest degree first or an int d standing for (x + d). The input is
+    not modified.
+    """
+    if not isinstance(divisor, int):
+        return polynomial_divmod(polynomial, divisor)[0]
+    polynomial = polynomial[::-1]
     c1 = polynomial[0]
     remainder = polynomial[1]
     final_polynomial = []
@@ -23,46 +214,3 @@ def polynomial_division(polynomial, divisor):
             remainder = polynomial[i + 2]
     final_polynomial.reverse()
     return final_polynomial
-
-
-# low-level lagrange interpolation reduced mod prime
-def __interpolate_polynomial(x, y, prime):
-    M = [[_x**i * (-1) ** (i * len(x)) for _x in x] for i in range(len(x))]
-    N = [(M + [y] + M)[d : d + len(x)] for d in range(len(x) + 1)]
-    C = [__determinant(k) for k in N]
-    fac = __mod_inv(C[0] * (-1) ** (len(x) + 1), prime)
-    C = [i * fac % prime for i in C]
-    return C[1:]
-
-
-def __determinant(m):
-    M = [row[:] for row in m]
-    N, sign, prev = len(M), 1, 1
-    for i in range(N - 1):
-        if M[i][i] == 0:
-            swapto = next((j for j in range(i + 1, N) if M[j][i] != 0), None)
-            if swapto is None:
-                return 0
-            M[i], M[swapto], sign = M[swapto], M[i], -sign
-        for j in range(i + 1, N):
-            for k in range(i + 1, N):
-                assert (M[j][k] * M[i][i] - M[j][i] * M[i][k]) % prev == 0
-                M[j][k] = (M[j][k] * M[i][i] - M[j][i] * M[i][k]) // prev
-        prev = M[i][i]
-    return sign * M[-1][-1]
-
-
-# modular math
-def __mod_inv(x, p):
-    assert __gcd(x, p) == 1, "Divisor %d not coprime to modulus %d" % (x, p)
-    z, a = (x % p), 1
-    while z != 1:
-        q = -(p // z)
-        z, a = (p + q * z), (q * a) % p
-    return a
-
-
-def __gcd(a, b):
-    while b:
-        a, b = b, a % b
-    return a
@@ -1,5 +1,5 @@
 from zkp.prover import Prover
-from zkp.verifier import Verifier
+from zkp.verifier import Verifier, BatchVerifier, random_challenge
 from zkp.trusted_setup import setup
 import hashlib
 
@@ -49,6 +49,97 @@ def login_user(username, password):
     else:
         return False
 
+def login_user_non_interactive(username, password):
+    global stored_provers, stored_commitments
+
+    if username not in stored_provers:
+        return False
+
+    commitment = stored_commitments[username]
+    verifier = Verifier(setup)
+    verifier.setCommitment(commitment)
+
+    # O cliente recebe o nonce e responde com uma unica mensagem (b, W)
+    nonce = verifier.getNonce()
+    hashed_password = hash_password(password)
+    login_prover = Prover(setup, hashed_password.encode())
+    b, proof = login_prover.prove(nonce, username.encode(), commitment)
+
+    return verifier.verifyProof(b, proof, username.encode())
+
+def login_user_multi(username, password, k=4):
+    global stored_provers, stored_commitments
+
+    if username not in stored_provers:
+        return False
+
+    commitment = stored_commitments[username]
+    verifier = Verifier(setup)
+    verifier.setCommitment(commitment)
+
+    hashed_password = hash_password(password)
+    login_prover = Prover(setup, hashed_password.encode())
+
+    # k desafios checados com uma unica prova e um unico produto de pairings
+    points = verifier.getChallenges(k)
+    verifier.setBs(login_prover.FAMany(points))
+    proof = login_prover.WSMany(points)
+
+    return verifier.verifyMany(proof)
+
+def login_users(credentials):
+    """
+    Verifica um lote de logins (username, password) com um unico produto
+    de pairings, retornando o resultado de cada um.
+    """
+    results = [False] * len(credentials)
+    batch = BatchVerifier(setup)
+    pending = []
+
+    for i, (username, password) in enumerate(credentials):
+        if username not in stored_provers:
+            continue
+
+        hashed_password = hash_password(password)
+        login_prover = Prover(setup, hashed_password.encode())
+
+        a = random_challenge()
+        b = login_prover.FA(a)
+        proof = login_prover.WS(a)
+
+        batch.add(stored_commitments[username], a, b, proof)
+        pending.append(i)
+
+    for i, ok in zip(pending, batch.verify()):
+        results[i] = ok
+    return results
+
+def login_users_parallel(credentials, executor):
+    """
+    Verifica um lote de logins (username, password) num VerificationExecutor,
+    com as provas e as verificacoes distribuidas entre os processos do pool.
+    """
+    results = [False] * len(credentials)
+    proofs = []
+
+    for i, (username, password) in enumerate(credentials):
+        if username not in stored_provers:
+            continue
+
+        hashed_password = hash_password(password)
+        a = random_challenge()
+        proofs.append((i, a, executor.submit_prove(hashed_password.encode(), a)))
+
+    checks = []
+    for i, a, proof in proofs:
+        b, ws = proof.result()
+        commitment = stored_commitments[credentials[i][0]]
+        checks.append((i, executor.submit_verify(commitment, a, b, ws)))
+
+    for i, check in checks:
+        results[i] = check.result()
+    return results
+
 if __name__ == '__main__':
     register_user("usuario1", "senhasegura")
     register_user("usuario2", "senhasegura2")
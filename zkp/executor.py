@@ -0,0 +1,99 @@
+from zkp.trusted_setup import TrustedSetup, SETUP_PATH_ENV, load_setup, save_setup
+from zkp.verifier import check_opening, check_proof
+from zkp.prover import Prover
+from bib.ec import JacobianPoint
+from concurrent.futures import Future, ProcessPoolExecutor
+import os
+import tempfile
+
+# Setup carregado uma unica vez em cada processo do pool
+_setup: TrustedSetup = None
+
+def _init_worker(path: str):
+    global _setup
+    _setup = load_setup(path)
+
+# Pontos recebidos para verificacao passam pelo teste de subgrupo de from_bytes;
+# os devolvidos pelos processos do proprio pool sao confiaveis
+def _verify(commit: bytes, a: int, b: int, ws: bytes) -> bool:
+    return check_opening(_setup, JacobianPoint.from_bytes(commit), a, b, JacobianPoint.from_bytes(ws))
+
+def _verify_proof(commit: bytes, nonce: bytes, b: int, ws: bytes, transcript: bytes) -> bool:
+    return check_proof(_setup, JacobianPoint.from_bytes(commit), nonce, b, JacobianPoint.from_bytes(ws), transcript)
+
+def _prove(password, a: int):
+    prover = Prover(_setup, password)
+    return prover.FA(a), bytes(prover.WS(a))
+
+def _commit(password) -> bytes:
+    return bytes(Prover(_setup, password).committedFS())
+
+def _then(future: Future, fn) -> Future:
+    # Future com fn aplicada ao resultado, no processo atual
+    chained = Future()
+
+    def done(f):
+        try:
+            chained.set_result(fn(f.result()))
+        except BaseException as e:
+            chained.set_exception(e)
+
+    future.add_done_callback(done)
+    return chained
+
+class VerificationExecutor:
+    """
+    Pool de processos para verificar e gerar provas em paralelo, ja que a
+    aritmetica em Python puro segura o GIL. Cada processo carrega o setup do
+    arquivo uma unica vez, e os pontos trafegam comprimidos (48 bytes em G1).
+    Um setup gerado em memoria e salvo num arquivo temporario.
+    """
+
+    def __init__(self, setup: TrustedSetup = None, max_workers: int = None, mp_context=None):
+        self.__temporary = None
+        path = getattr(setup, "path", None)
+        if setup is None:
+            path = os.environ.get(SETUP_PATH_ENV)
+            if not path:
+                raise ValueError("a setup or $%s is required" % SETUP_PATH_ENV)
+        elif path is None:
+            fd, path = tempfile.mkstemp(suffix=".setup")
+            os.close(fd)
+            save_setup(setup, path)
+            self.__temporary = path
+        # O caminho vai so nos initargs; importar zkp.trusted_setup nos
+        # processos nao cria setup nenhum, entao cada um carrega o arquivo uma vez
+        self.__pool = ProcessPoolExecutor(max_workers, mp_context, initializer=_init_worker, initargs=(path,))
+
+    def submit_verify(self, commit, a: int, b: int, ws) -> Future:
+        # Future[bool] da verificacao interativa do desafio a
+        return self.__pool.submit(_verify, bytes(commit), a, b, bytes(ws))
+
+    def submit_verify_proof(self, commit, nonce: bytes, b: int, ws, transcript: bytes = b"") -> Future:
+        # Future[bool] da verificacao nao interativa
+        return self.__pool.submit(_verify_proof, bytes(commit), nonce, b, bytes(ws), transcript)
+
+    def submit_prove(self, password, a: int) -> Future:
+        # Future[(b, W)] da prova do desafio a
+        return _then(self.__pool.submit(_prove, password, a), lambda r: (r[0], JacobianPoint.from_bytes_unchecked(r[1])))
+
+    def submit_commit(self, password) -> Future:
+        # Future[JacobianPoint] do compromisso do polinomio
+        return _then(self.__pool.submit(_commit, password), JacobianPoint.from_bytes_unchecked)
+
+    def verify_many(self, entries) -> list[bool]:
+        # Verifica (commit, a, b, ws) em paralelo, na ordem de entrada
+        futures = [self.submit_verify(*entry) for entry in entries]
+        return [f.result() for f in futures]
+
+    def shutdown(self, wait: bool = True):
+        self.__pool.shutdown(wait)
+        if self.__temporary is not None:
+            os.remove(self.__temporary)
+            self.__temporary = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
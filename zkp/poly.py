@@ -1,45 +1,45 @@
-from binascii import hexlify
 from bib.bls12381 import n, MINUS1
-from bib.polynomial import polynomial_division, lagrange_polynomial
-from bib.codec import format_data
+from bib.polynomial import polynomial_division, get_domain, evaluate, evaluate_many
+from bib.field_polynomial import FieldPolynomial
+from bib.ntt import RootsOfUnityDomain, get_roots_domain
+from bib.codec import CHUNK_SIZE, field_elements
+from bib.ec import multi_scalar_mult, FixedBaseMSM
 
 
 class Polynomial:
-    def __init__(self, password):
+    def __init__(self, password, domain=None):
         if password is None:
             return
-        chunk_size = 31  # simple way to get chunks that safely map to GF(n)
-        password = format_data(password, 16 * chunk_size)
-        self.__points = [
-            (
-                i,
-                int(
-                    hexlify(password[i * chunk_size : (i + 1) * chunk_size]).decode(),
-                    16,
-                ),
-            )
-            for i in range(16)
-        ]
-        self.__coeficients: list[int] = lagrange_polynomial(self.__points)
+        # Dominio de interpolacao, por padrao os pontos 0..15; entradas
+        # maiores usam um dominio de raizes da unidade com pontos suficientes
+        if isinstance(password, str):
+            password = password.encode("utf-8")
+        needed = -(-memoryview(password).nbytes // CHUNK_SIZE)
+        if domain is None:
+            domain = get_domain(16) if needed <= 16 else get_roots_domain(1 << (needed - 1).bit_length())
+        chunks = len(domain)
+        assert needed <= chunks, "data too large"
+        values = list(field_elements(password))
+        values += [0] * (chunks - len(values))
+        self.__points = list(zip(domain.points, values))
+        self.__coeficients: list[int] = domain.interpolate(values)
 
     def setPoly(self, poly: list[int]):
         self.__coeficients: list[int] = poly
 
     def apply(self, x):
-        # Recebe uma lista com valores ja exponenciados
-        if isinstance(x, list):
-            for i, (xi, ci) in enumerate(zip(x, self.__coeficients)):
-                if not i:
-                    acc = ci * xi
-                    continue
-                acc += ci * xi
-            return acc
+        # Recebe uma lista ou tabelas de base fixa com valores ja exponenciados
+        if isinstance(x, (list, FixedBaseMSM)):
+            return _commit(self.__coeficients, x)
 
         # Avaliacao normal
-        acc = 0
-        for i, ci in enumerate(self.__coeficients):
-            acc += pow(x, i, n) * ci
-        return acc % n
+        return evaluate(self.__coeficients, x)
+
+    def apply_many(self, xs):
+        # Avalia em varios pontos, com NTT se for um dominio de raizes da unidade
+        if isinstance(xs, RootsOfUnityDomain):
+            return xs.evaluate(self.__coeficients)
+        return evaluate_many(self.__coeficients, list(xs))
 
     def divide(self, a):
         b = self.apply(a)
@@ -51,5 +51,26 @@ class Polynomial:
         wx.setPoly(wcoef)
         return wx
 
+    def divide_many(self, points):
+        # Quociente de f pelo polinomio que se anula em todos os pontos; o
+        # resto, que interpola f nos pontos, fica a cargo do verificador
+        f = FieldPolynomial(self.__coeficients)
+        wx = Polynomial(None)
+        wx.setPoly((f // FieldPolynomial.vanishing(points)).coefficients)
+        return wx
+
+    def open_many(self, x, challenges):
+        # Valores e provas (f(a), W_a) de varios desafios, um quociente por
+        # desafio comprometido com as tabelas de base fixa
+        challenges = list(challenges)
+        values = self.apply_many(challenges)
+        return [(b, self.divide(a).apply(x)) for a, b in zip(challenges, values)]
+
     def get_coefficients(self):
         return self.__coeficients
+
+
+def _commit(coeficients, x):
+    if isinstance(x, FixedBaseMSM):
+        return x.mult(coeficients)
+    return multi_scalar_mult(coeficients, x[: len(coeficients)])
@@ -1,20 +1,78 @@
 from zkp.trusted_setup import TrustedSetup
 from zkp.poly import Polynomial
+from zkp.verifier import CHALLENGES
+from zkp.transcript import challenge
+from collections import OrderedDict
+
+# Provas pre-computadas por (setup, polinomio), descartando as menos usadas
+OPENINGS_CACHE_SIZE = 1024
+_openings: OrderedDict = OrderedDict()
+
+def _get_openings(key):
+    openings = _openings.get(key)
+    if openings is not None:
+        _openings.move_to_end(key)
+    return openings
+
+def _store_openings(key, openings: dict):
+    _openings[key] = openings
+    _openings.move_to_end(key)
+    while len(_openings) > OPENINGS_CACHE_SIZE:
+        _openings.popitem(last=False)
 
 class Prover:
-    def __init__(self, setup: TrustedSetup, password: int):
+    def __init__(self, setup: TrustedSetup, password: int, domain=None, precompute: bool = False):
         self.__setup: TrustedSetup = setup
-        self.__poly: Polynomial = Polynomial(password)
-    
+        self.__poly: Polynomial = Polynomial(password, domain)
+        if precompute:
+            self.precompute()
+
+    def __key(self):
+        return (self.__setup, tuple(self.__poly.get_coefficients()))
+
+    def precompute(self, challenges=CHALLENGES):
+        # Calcula f(a) e a prova de todos os desafios de uma vez; logins
+        # seguintes com o mesmo polinomio viram consultas ao cache
+        openings = self.__poly.open_many(self.__setup.getSBSTable(), challenges)
+        _store_openings(self.__key(), dict(zip(challenges, openings)))
+
+    def __cached(self, a):
+        openings = _get_openings(self.__key())
+        if openings is None:
+            return None
+        return openings.get(a)
+
     def committedFS(self):
-        return self.__poly.apply(self.__setup.getSBS())
-    
+        return self.__poly.apply(self.__setup.getSBSTable())
+
     def FA(self, a):
+        cached = self.__cached(a)
+        if cached is not None:
+            return cached[0]
         return self.__poly.apply(a)
 
     def WS(self, a):
+        cached = self.__cached(a)
+        if cached is not None:
+            return cached[1]
         wx: Polynomial = self.__poly.divide(a)
-        return wx.apply(self.__setup.getSBS())
+        return wx.apply(self.__setup.getSBSTable())
+
+    def FAMany(self, points):
+        return self.__poly.apply_many(points)
+
+    def WSMany(self, points):
+        # Uma unica prova para todos os pontos
+        wx: Polynomial = self.__poly.divide_many(points)
+        return wx.apply(self.__setup.getSBSTable())
+
+    def prove(self, nonce: bytes, transcript: bytes = b"", commit=None):
+        # Modo nao interativo: o desafio vem do hash do compromisso, do nonce
+        # e do transcript, e a mensagem (b, W) vai numa unica ida
+        if commit is None:
+            commit = self.committedFS()
+        a = challenge(commit, nonce, transcript)
+        return self.FA(a), self.WS(a)
 
     def get_polynomial(self):
         return self.__poly.get_coefficients()
@@ -0,0 +1,15 @@
+from bib.bls12381 import n
+import hashlib
+
+# Separador de dominio do desafio Fiat-Shamir do login
+FS_DOMAIN = b"ZKP-LOGIN-FS-V1"
+
+def challenge(commit, nonce: bytes, transcript: bytes = b"") -> int:
+    # Desafio derivado do compromisso, do nonce da sessao e do transcript.
+    # Cada parte vai prefixada pelo tamanho, e os 512 bits do hash reduzidos
+    # mod n deixam o desafio praticamente uniforme no corpo dos escalares
+    h = hashlib.sha512()
+    for part in (FS_DOMAIN, bytes(commit), nonce, transcript):
+        h.update(len(part).to_bytes(8, "big"))
+        h.update(part)
+    return int.from_bytes(h.digest(), "big") % n
@@ -1,6 +1,11 @@
-from bib.ec import JacobianPoint, AffinePoint, EC
+from bib.ec import JacobianPoint, AffinePoint, EC, FixedBaseMSM, fixed_base_window, scalar_mult_glv, scalar_mult_gls, normalize
+from bib.fields import Fq, Fq2
 import bib.bls12381 as bls12381
 from secrets import randbelow
+import argparse
+import mmap
+import os
+import struct
 
 def rand_int(prime):
 	return __randrange(1, prime-1)
@@ -8,14 +13,24 @@ def rand_int(prime):
 def __randrange(lower, upper):
 	return randbelow(upper-lower)+lower
 
+# Potencias s^i G2 geradas por padrao: abrir k desafios exige k + 1 delas, e
+# zkp.verifier.CHALLENGES tem 15 desafios
+MAX_G2_POWER = 16
+
 class TrustedSetup:
-    def __init__(self, s: int, power: int = 16):
+    def __init__(self, s: int, power: int = 16, table_memory: int = 16 << 20, g2_power: int = None):
         ec1 = EC(*bls12381.parameters())
         ec2 = EC(*bls12381.parameters_twist()) 
         self.__G1: JacobianPoint = AffinePoint(ec1.gx, ec1.gy, False, ec1).to_jacobian()
         self.__G2: JacobianPoint = AffinePoint(ec2.g2x, ec2.g2y, False, ec2).to_jacobian()
-        self.__encripted_s: list[JacobianPoint] = [s**i % bls12381.n * self.__G1 for i in range(power)]
-        self.__s_G2: JacobianPoint = self.__G2 * s
+        # Potencias com z = 1, somadas com a adicao mista
+        self.__encripted_s: list[JacobianPoint] = normalize([scalar_mult_glv(pow(s, i, bls12381.n), self.__G1, ec1) for i in range(power)])
+        # Potencias s^i G2, i < g2_power, para aberturas em varios pontos
+        if g2_power is None:
+            g2_power = min(power, MAX_G2_POWER)
+        self.__g2_powers: list[JacobianPoint] = [self.__G2] + [scalar_mult_gls(pow(s, i, bls12381.n), self.__G2, ec2) for i in range(1, max(g2_power, 2))]
+        self._table_memory = table_memory
+        self._sbs_table: FixedBaseMSM = None
 
     def getG1(self): return self.__G1
 
@@ -23,11 +38,150 @@ class TrustedSetup:
 
     def getSBS(self): return self.__encripted_s
 
-    def getSG2(self): return self.__s_G2
+    def getSG2(self): return self.__g2_powers[1]
+
+    def getSG2Powers(self): return self.__g2_powers
+
+    def getSBSTable(self):
+        # Tabelas de base fixa construidas no primeiro uso; se nem a menor
+        # janela cabe em table_memory, devolve os pontos para uma MSM comum
+        if self._sbs_table is None:
+            sbs = self.getSBS()
+            if fixed_base_window(len(sbs), self._table_memory, bls12381.n.bit_length()) is None:
+                self._sbs_table = list(sbs)
+            else:
+                self._sbs_table = FixedBaseMSM(sbs, self._table_memory)
+        return self._sbs_table
+
+# Formato binario do setup:
+#   magic (8 bytes) | versao (u8) | numero de potencias em G1 e em G2 (u32 cada)
+#   G1 | s^i G1 ... | s^i G2 ...  (pontos afins, coordenadas big endian)
+# Os pontos ficam descomprimidos para que a leitura nao precise de raizes quadradas.
+SETUP_MAGIC = b"ZKPSETUP"
+SETUP_VERSION = 1
+SETUP_HEADER = struct.Struct(">8sBII")
+G1_SIZE = 2 * 48
+G2_SIZE = 2 * 96
+
+# Variavel de ambiente com o caminho do setup carregado na importacao
+SETUP_PATH_ENV = "ZKP_SETUP"
+
+def save_setup(setup: TrustedSetup, path: str):
+    g2_powers = setup.getSG2Powers()
+    with open(path, "wb") as f:
+        f.write(SETUP_HEADER.pack(SETUP_MAGIC, SETUP_VERSION, len(setup.getSBS()), len(g2_powers)))
+        for point in [setup.getG1()] + list(setup.getSBS()) + g2_powers:
+            f.write(__encode_point(point))
+
+def load_setup(path: str, table_memory: int = 16 << 20):
+    return MappedTrustedSetup(path, table_memory)
+
+def __encode_point(point: JacobianPoint) -> bytes:
+    if point.infinity:
+        raise ValueError("setup points can not be at infinity")
+    affine = point.to_affine()
+    return bytes(affine.x) + bytes(affine.y)
+
+def _decode_point(buffer, FE, ec) -> JacobianPoint:
+    half = len(buffer) // 2
+    x = FE.from_bytes(bytes(buffer[:half]), ec.q)
+    y = FE.from_bytes(bytes(buffer[half:]), ec.q)
+    point = AffinePoint(x, y, False, ec)
+    if not point.is_on_curve():
+        raise ValueError("invalid setup point")
+    return point.to_jacobian()
+
+class MappedTrustedSetup(TrustedSetup):
+    """
+    Setup lido de um arquivo gerado por save_setup. O arquivo e mapeado em
+    memoria, compartilhado entre processos, e cada grupo de pontos so e
+    decodificado no primeiro acesso.
+    """
+
+    def __init__(self, path: str, table_memory: int = 16 << 20):
+        self.path = path
+        with open(path, "rb") as f:
+            self.__buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, g1_count, g2_count = SETUP_HEADER.unpack_from(self.__buffer)
+        if magic != SETUP_MAGIC or version != SETUP_VERSION:
+            raise ValueError("not a trusted setup file")
+        if g2_count < 2:
+            raise ValueError("setup must contain G2 and sG2")
+        expected = SETUP_HEADER.size + (1 + g1_count) * G1_SIZE + g2_count * G2_SIZE
+        if len(self.__buffer) != expected:
+            raise ValueError("truncated trusted setup file")
+        self.__g1_count = g1_count
+        self.__g2_count = g2_count
+        self.__ec1 = EC(*bls12381.parameters())
+        self.__ec2 = EC(*bls12381.parameters_twist())
+        self._table_memory = table_memory
+        self.__g1_points = None
+        self.__g2_points = None
+        self._sbs_table: FixedBaseMSM = None
+
+    def __g1(self):
+        if self.__g1_points is None:
+            view = memoryview(self.__buffer)[SETUP_HEADER.size:]
+            self.__g1_points = [
+                _decode_point(view[i * G1_SIZE : (i + 1) * G1_SIZE], Fq, self.__ec1)
+                for i in range(1 + self.__g1_count)
+            ]
+            view.release()
+        return self.__g1_points
+
+    def __g2(self):
+        if self.__g2_points is None:
+            start = SETUP_HEADER.size + (1 + self.__g1_count) * G1_SIZE
+            view = memoryview(self.__buffer)[start:]
+            self.__g2_points = [
+                _decode_point(view[i * G2_SIZE : (i + 1) * G2_SIZE], Fq2, self.__ec2)
+                for i in range(self.__g2_count)
+            ]
+            view.release()
+        return self.__g2_points
+
+    def getG1(self): return self.__g1()[0]
+
+    def getG2(self): return self.__g2()[0]
+
+    def getSBS(self): return self.__g1()[1:]
+
+    def getSG2(self): return self.__g2()[1]
+
+    def getSG2Powers(self): return self.__g2()
+
+def default_setup():
+    # Usa o setup salvo em $ZKP_SETUP, se houver, em vez de gerar um novo
+    path = os.environ.get(SETUP_PATH_ENV)
+    if path:
+        return load_setup(path)
+    return TrustedSetup(rand_int(bls12381.n))
 	
 def rand_int(prime):
 	return __randrange(1, prime-1)
 
 def __randrange(lower, upper):
 	return randbelow(upper-lower)+lower
-setup = TrustedSetup(rand_int(bls12381.n))
\ No newline at end of file
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera um trusted setup e o salva em disco")
+    parser.add_argument("path", help="arquivo de saida")
+    parser.add_argument("--power", type=int, default=16, help="numero de potencias s^i G1")
+    parser.add_argument("--g2-power", type=int, default=None, help="numero de potencias s^i G2 (padrao: min(--power, %d))" % MAX_G2_POWER)
+    args = parser.parse_args()
+    save_setup(TrustedSetup(rand_int(bls12381.n), args.power, g2_power=args.g2_power), args.path)
+
+# Setup padrao do modulo, criado (ou lido de $ZKP_SETUP) no primeiro acesso a
+# zkp.trusted_setup.setup, independente de como o arquivo foi executado
+_default_setup: TrustedSetup = None
+
+def __getattr__(name):
+    global _default_setup
+    if name == "setup":
+        if _default_setup is None:
+            _default_setup = default_setup()
+        return _default_setup
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+if __name__ == "__main__":
+    main()
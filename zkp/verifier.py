@@ -1,26 +1,179 @@
-from zkp.trusted_setup import TrustedSetup
-from bib.pairing import tate_pairing
-from bib.bls12381 import MINUS1
-from random import randint
+from zkp.trusted_setup import TrustedSetup, MAX_G2_POWER
+from zkp.transcript import challenge
+from zkp.poly import Polynomial
+from bib.pairing import pairing_product_is_one, prepare_g2, G2Prepared
+from bib.ec import multi_scalar_mult, scalar_mult_glv, scalar_mult_gls
+from bib.polynomial import EvaluationDomain, vanishing_polynomial
+from bib.bls12381 import n, MINUS1
+from random import randint, sample
+from secrets import randbits, token_bytes
+from functools import lru_cache
+
+
+# Desafios possiveis, sorteados pelo verificador; o setup padrao tem potencias
+# de G2 para abrir todos de uma vez
+CHALLENGES = range(1, MAX_G2_POWER)
+
+# Tamanho em bytes do nonce de sessao do modo nao interativo
+NONCE_SIZE = 32
+
+
+def random_challenge() -> int:
+    return randint(CHALLENGES.start, CHALLENGES.stop - 1)
+
+
+# Linhas do Miller loop dos pontos de G2 fixos, por setup e desafio
+@lru_cache(maxsize=16)
+def _prepared_g2(setup: TrustedSetup) -> G2Prepared:
+    return prepare_g2(setup.getG2())
+
+
+@lru_cache(maxsize=16)
+def _prepared_sg2(setup: TrustedSetup) -> G2Prepared:
+    return prepare_g2(setup.getSG2())
+
+
+@lru_cache(maxsize=256)
+def _prepared_s_minus_a(setup: TrustedSetup, a: int) -> G2Prepared:
+    return prepare_g2(setup.getSG2() - scalar_mult_gls(a, setup.getG2()))
+
+
+@lru_cache(maxsize=256)
+def _prepared_vanishing(setup: TrustedSetup, points: tuple) -> G2Prepared:
+    # Z(s) G2, com Z(x) = prod(x - a_i), a partir das potencias s^i G2
+    Z = vanishing_polynomial(points)
+    powers = setup.getSG2Powers()
+    if len(Z) > len(powers):
+        raise ValueError("setup has too few powers of s in G2")
+    return prepare_g2(multi_scalar_mult(Z, powers[: len(Z)]))
+
+
+@lru_cache(maxsize=256)
+def _domain(points: tuple) -> EvaluationDomain:
+    return EvaluationDomain(points)
+
+
+def check_opening(setup: TrustedSetup, commit, a, b, ws) -> bool:
+    # e(W, sG2 - aG2) * e(-(C - bG1), G2) == 1
+    fs_minus_b = commit - scalar_mult_glv(b, setup.getG1())
+    return pairing_product_is_one(
+        [(ws, _prepared_s_minus_a(setup, a)), (-fs_minus_b, _prepared_g2(setup))]
+    )
+
+
+def check_proof(setup: TrustedSetup, commit, nonce: bytes, b, ws, transcript: bytes = b"") -> bool:
+    # Modo nao interativo: recalcula o desafio a partir do compromisso e do
+    # nonce da sessao. O desafio e um escalar qualquer, entao usa
+    # e(W, sG2) * e(-(C - bG1 + aW), G2) == 1, que so opera em G1
+    a = challenge(commit, nonce, transcript)
+    rhs = multi_scalar_mult([1, MINUS1 * b % n, a], [commit, setup.getG1(), ws])
+    return pairing_product_is_one(
+        [(ws, _prepared_sg2(setup)), (-rhs, _prepared_g2(setup))]
+    )
 
 
 class Verifier:
     def __init__(self, setup: TrustedSetup):
         self.__setup = setup
-        self.__a = randint(1, 15)
+        self.__a = random_challenge()
+        self.__nonce = token_bytes(NONCE_SIZE)
 
     def getA(self):
         return self.__a
 
+    def getNonce(self):
+        return self.__nonce
+
+    def getChallenges(self, k):
+        # k desafios distintos, abertos com uma unica prova
+        self.__points = tuple(sorted(sample(CHALLENGES, k)))
+        return list(self.__points)
+
     def setB(self, b):
         self.__b = b
 
+    def setBs(self, bs):
+        self.__bs = list(bs)
+
     def setCommitment(self, commit):
         self.__commit = commit
 
     def verify(self, ws):
-        s_minus_a = self.__setup.getSG2() + MINUS1 * self.__a * self.__setup.getG2()
-        fs_minus_b = self.__commit + MINUS1 * self.__b * self.__setup.getG1()
-        return tate_pairing(ws, s_minus_a) == tate_pairing(
-            fs_minus_b, self.__setup.getG2()
+        return check_opening(self.__setup, self.__commit, self.__a, self.__b, ws)
+
+    def verifyMany(self, ws):
+        # r interpola os valores b_i nos desafios; f - r e divisivel por Z,
+        # entao e(W, Z(s)G2) * e(-(C - r(s)G1), G2) == 1
+        rx = Polynomial(None)
+        rx.setPoly(_domain(self.__points).interpolate(self.__bs))
+        rs = rx.apply(self.__setup.getSBSTable())
+        return pairing_product_is_one(
+            [
+                (ws, _prepared_vanishing(self.__setup, self.__points)),
+                (-(self.__commit - rs), _prepared_g2(self.__setup)),
+            ]
+        )
+
+    def verifyProof(self, b, ws, transcript: bytes = b""):
+        return check_proof(self.__setup, self.__commit, self.__nonce, b, ws, transcript)
+
+
+class BatchVerifier:
+    """
+    Verifica varias provas de uma vez. Cada prova satisfaz
+    e(W, sG2) == e(C - bG1 + aW, G2), entao uma combinacao linear com
+    escalares aleatorios r_i das N equacoes vira duas MSMs e um unico
+    produto de dois pairings. Se o lote falhar, ele e dividido ao meio
+    ate encontrar as provas invalidas.
+    """
+
+    def __init__(self, setup: TrustedSetup):
+        self.__setup = setup
+        self.__entries = []
+
+    def add(self, commit, a, b, ws):
+        self.__entries.append((commit, a, b, ws))
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def verify(self) -> list[bool]:
+        results = [False] * len(self.__entries)
+        self.__bisect(list(range(len(self.__entries))), results)
+        return results
+
+    def __bisect(self, indices, results):
+        if not indices:
+            return
+        if self.__check(indices):
+            for i in indices:
+                results[i] = True
+            return
+        if len(indices) == 1:
+            return
+        half = len(indices) // 2
+        self.__bisect(indices[:half], results)
+        self.__bisect(indices[half:], results)
+
+    def __check(self, indices) -> bool:
+        entries = [self.__entries[i] for i in indices]
+        # Escalares de 128 bits, nao nulos
+        r = [randbits(128) | 1 for _ in entries]
+
+        proofs = [ws for _, _, _, ws in entries]
+        w_sum = multi_scalar_mult(r, proofs)
+
+        rb = sum(ri * b for ri, (_, _, b, _) in zip(r, entries)) % n
+        points = [commit for commit, _, _, _ in entries] + proofs
+        points.append(self.__setup.getG1())
+        scalars = r + [ri * a % n for ri, (_, a, _, _) in zip(r, entries)]
+        scalars.append(MINUS1 * rb % n)
+        rhs = multi_scalar_mult(scalars, points)
+
+        # e(sum r_i W_i, sG2) * e(-sum r_i (C_i - b_i G1 + a_i W_i), G2) == 1
+        return pairing_product_is_one(
+            [
+                (w_sum, _prepared_sg2(self.__setup)),
+                (-rhs, _prepared_g2(self.__setup)),
+            ]
         )